@@ -1,4 +1,4 @@
-from . import reddit_json  # noqa: F401
+from . import reddit_json, rss  # noqa: F401
 
 try:
     ADAPTERS  # type: ignore[name-defined]
@@ -8,5 +8,6 @@ except NameError:
 ADAPTERS.update(
     {
         "reddit_json": reddit_json,
+        "rss": rss,
     }
 )
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import datetime as dt
-from typing import Any, Dict, Iterable, List
+import json
+from typing import Any, Callable, Dict, Iterable, List
 
 import requests
 
+from ..sinks import open_sink
+from ..text import SUMMARY_CHARS, summarize
+
 UA = (
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
     "(KHTML, like Gecko) Chrome/124 Safari/537.36"
@@ -15,21 +19,40 @@ def _to_iso_utc(created_utc: float | int) -> str:
     return dt.datetime.fromtimestamp(float(created_utc), dt.timezone.utc).isoformat()
 
 
-def _summary(text: str | None, limit: int = 280) -> str:
-    if not text:
-        return ""
-    s = text.strip().replace("\r", " ").replace("\n", " ")
-    return (s[: limit - 1] + "…") if len(s) > limit else s
+def _summary(text: str | None, limit: int = SUMMARY_CHARS) -> str:
+    # selftext is markdown, not HTML: only whitespace is collapsed
+    return summarize(text, limit, html=False)
+
+
+class Listing(List[Dict[str, Any]]):
+    """Normalized items that also remember the size of the response body."""
 
+    n_bytes: int | None = None
 
-def fetch(url: str, name: str) -> List[Dict[str, Any]]:
+
+def fetch(
+    url: str, name: str, timeout: float = 20, summary_chars: int = SUMMARY_CHARS
+) -> List[Dict[str, Any]]:
     """
-    Fetch and normalize a Reddit listing JSON payload into a list[dict].
+    Fetch and normalize a Reddit listing JSON payload into a list[dict]
+    (a ``Listing``, whose ``n_bytes`` is the body size when known).
     NOTE: Tests monkeypatch requests.get; no network is used during tests.
     """
-    resp = requests.get(url, headers={"User-Agent": UA}, timeout=20)
+    resp = requests.get(url, headers={"User-Agent": UA}, timeout=timeout)
     resp.raise_for_status()
-    payload = resp.json()
+    items = Listing(normalize(resp.json(), name, url, summary_chars))
+    body = getattr(resp, "content", None)
+    if isinstance(body, (bytes, bytearray)):
+        items.n_bytes = len(body)
+    return items
+
+
+def normalize(
+    payload: Dict[str, Any],
+    name: str,
+    url: str,
+    summary_chars: int = SUMMARY_CHARS,
+) -> List[Dict[str, Any]]:
     children: Iterable[Dict[str, Any]] = payload.get("data", {}).get("children", [])
     out: List[Dict[str, Any]] = []
     for child in children:
@@ -41,7 +64,7 @@ def fetch(url: str, name: str) -> List[Dict[str, Any]]:
                 "id": f"reddit:{d.get('id')}",
                 "title": d.get("title") or "",
                 "url": url_out,
-                "summary": _summary(d.get("selftext")),
+                "summary": _summary(d.get("selftext"), summary_chars),
                 # normalized ISO8601; useful for human inspection
                 "created_at": _to_iso_utc(d.get("created_utc", 0)),
                 "tags": ["reddit", f"r/{subreddit}"],
@@ -54,21 +77,97 @@ def fetch(url: str, name: str) -> List[Dict[str, Any]]:
     return out
 
 
-def run(name: str, url: str, out_path: str, since: Any | None = None) -> Dict[str, Any]:
+# -------- Pipeline stages (see campaignshare_fetcher.pipeline) --------
+def fetch_bytes(
+    url: str,
+    timeout: float = 20,
+    max_bytes: int | None = None,
+    reserve: Callable[[int], None] | None = None,
+) -> bytes:
     """
-    Stateful JSONL writer using fetch(url, name).
+    Download the listing body, refusing bodies larger than ``max_bytes``;
+    ``reserve`` is called with the running size before each chunk is kept.
+    """
+    with requests.get(
+        url, headers={"User-Agent": UA}, timeout=timeout, stream=True
+    ) as resp:
+        resp.raise_for_status()
+        chunks: List[bytes] = []
+        size = 0
+        for chunk in resp.iter_content(65536):
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise ValueError(f"response exceeds max_bytes={max_bytes}")
+            if reserve is not None:
+                reserve(size)
+            chunks.append(chunk)
+    return b"".join(chunks)
 
-    Returns:
-      {'ok': True/False, 'new': n_new, 'total': n_total, 'path'|'error'}.
+
+def parse_bytes(
+    raw: bytes, name: str, url: str, summary_chars: int = SUMMARY_CHARS
+) -> List[Dict[str, Any]]:
+    return normalize(json.loads(raw), name, url, summary_chars)
+
+
+def run(
+    name: str,
+    url: str,
+    out_path: str,
+    since: Any | None = None,
+    timeout: float | None = None,
+    journal: Any | None = None,
+    dedupe: Any | None = None,
+    summary_chars: int | None = None,
+) -> Dict[str, Any]:
     """
-    import json
-    from pathlib import Path as _P
+    Stateful writer using fetch(url, name); the output format follows the
+    ``out_path`` extension (see campaignshare_fetcher.sinks, JSONL by default).
 
+    ``timeout`` (seconds) and ``summary_chars`` are forwarded to fetch() when
+    given. With a run
+    ``journal`` (see campaignshare_fetcher.journal), fetched items are spooled
+    and an interrupted write is continued without fetching again. A shared
+    ``dedupe`` index (campaignshare_fetcher.canonical.UrlIndex) drops items
+    whose canonical URL another source already wrote.
+
+    Returns:
+      {'ok': True/False, 'new': n_new, 'total': n_total, 'path'|'error'},
+      plus 'bytes' (response size) when fetch() reported it.
+    """
+    n_bytes = None
     try:
-        items = fetch(url, name)
+        items = journal.load_spool(name) if journal is not None else None
+        if items is None:
+            kw: Dict[str, Any] = {}
+            if timeout is not None:
+                kw["timeout"] = timeout
+            if summary_chars is not None:
+                kw["summary_chars"] = summary_chars
+            items = fetch(url, name, **kw)
+            n_bytes = getattr(items, "n_bytes", None)
+            if journal is not None:
+                journal.save_spool(name, items)
     except Exception as e:  # defensive: normalize failure into result dict
         return {"ok": False, "error": str(e)}
 
+    res = write_items(name, items, out_path, since, journal=journal, dedupe=dedupe)
+    if n_bytes is not None:
+        res["bytes"] = n_bytes
+    return res
+
+
+def write_items(
+    name: str,
+    items: List[Dict[str, Any]],
+    out_path: str,
+    since: Any | None = None,
+    journal: Any | None = None,
+    dedupe: Any | None = None,
+) -> Dict[str, Any]:
+    """Filter by ``since``, dedupe against the ``.state`` file and write new items."""
+    from pathlib import Path as _P
+
     def _parse_since(s: Any | None) -> float | None:
         if s is None:
             return None
@@ -135,13 +234,31 @@ def run(name: str, url: str, out_path: str, since: Any | None = None) -> Dict[st
         # fallback: stable hash on (title, url)
         return str(hash((it.get("title", ""), it.get("url", ""))))
 
+    # items an interrupted run already appended (but never recorded in state)
+    recovered = journal.persisted_ids(name) - seen if journal is not None else set()
+    seen |= recovered
+
     new_items = [it for it in items if _id(it) not in seen]
 
-    if new_items:
-        mode = "a" if outp.exists() else "w"
-        with outp.open(mode, encoding="utf-8") as f:
-            for it in new_items:
-                f.write(json.dumps(it, ensure_ascii=False) + "\n")
+    dupes = 0
+    if dedupe is not None:
+        fresh = dedupe.filter(new_items)
+        dupes = len(new_items) - len(fresh)
+        # remember cross-source duplicates too, so they aren't re-checked
+        seen.update(_id(it) for it in new_items)
+        new_items = fresh
+
+    try:
+        if new_items:
+            with open_sink(out_path, source=name) as sink:
+                sink.write(new_items)
+    except BaseException:
+        if dedupe is not None:
+            dedupe.discard(new_items)  # not written: let a later run claim them
+        raise
+    if dedupe is not None:
+        dedupe.commit(new_items)
+    if new_items or recovered or dupes:
         # update state
         seen.update(_id(it) for it in new_items)
         try:
@@ -150,4 +267,12 @@ def run(name: str, url: str, out_path: str, since: Any | None = None) -> Dict[st
             # non-fatal: output was written successfully
             pass
 
-    return {"ok": True, "new": len(new_items), "total": len(items), "path": str(outp)}
+    res: Dict[str, Any] = {
+        "ok": True,
+        "new": len(new_items) + len(recovered),
+        "total": len(items),
+        "path": str(outp),
+    }
+    if dedupe is not None:
+        res["dupes"] = dupes
+    return res
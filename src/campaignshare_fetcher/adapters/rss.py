@@ -7,15 +7,55 @@ import urllib.error
 import urllib.request
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Dict, Iterable, Any
+from typing import Callable, Dict, Iterable, Any, Sequence
+
+from ..sinks import open_sink
+from ..text import SUMMARY_CHARS, summarize, summarize_element
 
 UA = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126 Safari/537.36"
 
+CONTENT_ENCODED = "{http://purl.org/rss/1.0/modules/content/}encoded"
+# Where summaries come from, in order of preference: "summary" is the RSS
+# <description> / atom:summary, "content" the full body (content:encoded /
+# atom:content). Overridable per source with ``summary_from``.
+SUMMARY_FROM = ("summary", "content")
+
 
-def _http_get(url: str, timeout: float = 20.0) -> bytes:
+def _http_get(
+    url: str,
+    timeout: float = 20.0,
+    max_bytes: int | None = None,
+    reserve: Callable[[int], None] | None = None,
+) -> bytes:
     req = urllib.request.Request(url, headers={"User-Agent": UA})
     with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return _read_capped(resp, max_bytes, reserve)
+
+
+def _read_capped(
+    resp: Any,
+    max_bytes: int | None,
+    reserve: Callable[[int], None] | None = None,
+    chunk: int = 65536,
+) -> bytes:
+    """
+    Read the body in chunks, refusing more than ``max_bytes``. ``reserve`` is
+    called with the running size before each chunk is kept (and may block).
+    """
+    if max_bytes is None and reserve is None:
         return resp.read()
+    parts: list[bytes] = []
+    size = 0
+    while True:
+        b = resp.read(chunk)
+        if not b:
+            return b"".join(parts)
+        size += len(b)
+        if max_bytes is not None and size > max_bytes:
+            raise ValueError(f"response exceeds max_bytes={max_bytes}")
+        if reserve is not None:
+            reserve(size)
+        parts.append(b)
 
 
 # -------- Normalizers --------
@@ -24,24 +64,76 @@ def _rss_text(parent: ET.Element, tag: str) -> str | None:
     return el.text.strip() if el is not None and el.text else None
 
 
-def _norm_rss_item(item: ET.Element) -> Dict[str, Any]:
+def _atom_kind(el: ET.Element) -> str | None:
+    """
+    How to read an atom:summary/atom:content body (RFC 4287 3.1.1, 4.1.3):
+    ``type`` defaults to "text"; content may also carry a MIME type. Returns
+    None for bodies that are not text (e.g. base64 media).
+    """
+    t = el.attrib.get("type", "text").strip().lower()
+    if t in ("html", "text/html"):
+        return "html"
+    if t == "xhtml" or t.endswith("+xml") or t.endswith("/xml"):
+        return "xhtml"
+    if t == "text" or t.startswith("text/"):
+        return "text"
+    return None
+
+
+def _summary_of(
+    fields: dict[str, tuple[ET.Element | None, str | None]],
+    summary_from: Sequence[str],
+    limit: int,
+) -> str:
+    """
+    First non-empty field in ``summary_from``, reduced to ``limit`` chars.
+    ``fields`` maps names to ``(element, kind)``, kind being "html", "text"
+    or "xhtml" (inline markup as child elements).
+    """
+    for f in summary_from:
+        el, kind = fields.get(f, (None, None))
+        if el is None or kind is None:
+            continue
+        if kind == "xhtml":
+            out = summarize_element(el, limit)
+        else:
+            out = summarize(el.text, limit, html=kind == "html")
+        if out:
+            return out
+    return ""
+
+
+def _norm_rss_item(
+    item: ET.Element,
+    summary_chars: int = SUMMARY_CHARS,
+    summary_from: Sequence[str] = SUMMARY_FROM,
+) -> Dict[str, Any]:
     title = _rss_text(item, "title") or ""
     link = _rss_text(item, "link") or ""
     guid = _rss_text(item, "guid") or link or title
     pub = _rss_text(item, "pubDate") or ""
     stable = guid or link or title or str(time.time())
     nid = hashlib.sha1(stable.encode("utf-8")).hexdigest()
+    # RSS bodies are (entity-escaped) HTML
+    fields = {
+        "summary": (item.find("description"), "html"),
+        "content": (item.find(CONTENT_ENCODED), "html"),
+    }
     return {
         "id": nid,
         "title": title,
         "url": link,
-        "summary": "",
+        "summary": _summary_of(fields, summary_from, summary_chars),
         "created_at": pub,
         "tags": ["rss"],
     }
 
 
-def _norm_atom_entry(entry: ET.Element) -> Dict[str, Any]:
+def _norm_atom_entry(
+    entry: ET.Element,
+    summary_chars: int = SUMMARY_CHARS,
+    summary_from: Sequence[str] = SUMMARY_FROM,
+) -> Dict[str, Any]:
     ns = {"atom": "http://www.w3.org/2005/Atom"}
     # title
     t = entry.find("atom:title", ns)
@@ -71,32 +163,46 @@ def _norm_atom_entry(entry: ET.Element) -> Dict[str, Any]:
     ).strip()
     stable = guid or link or title or str(time.time())
     nid = hashlib.sha1(stable.encode("utf-8")).hexdigest()
+    fields: dict[str, tuple[ET.Element | None, str | None]] = {}
+    for f in ("summary", "content"):
+        el = entry.find(f"atom:{f}", ns)
+        fields[f] = (el, _atom_kind(el) if el is not None else None)
     return {
         "id": nid,
         "title": title,
         "url": link,
-        "summary": "",
+        "summary": _summary_of(fields, summary_from, summary_chars),
         "created_at": when,
         "tags": ["rss", "atom"],
     }
 
 
 # -------- Parser that handles RSS and Atom --------
-def parse_feed(xml_bytes: bytes) -> Iterable[Dict[str, Any]]:
+def parse_feed(
+    xml_bytes: bytes,
+    summary_chars: int = SUMMARY_CHARS,
+    summary_from: Sequence[str] = SUMMARY_FROM,
+) -> Iterable[Dict[str, Any]]:
+    """
+    Yield normalized items. Summaries are plain text of at most
+    ``summary_chars`` characters (0 disables them), taken from the first
+    non-empty field in ``summary_from``.
+    """
     root = ET.fromstring(xml_bytes)
+    opts = {"summary_chars": summary_chars, "summary_from": summary_from}
 
     # RSS 2.0
     items = root.findall("./channel/item")
     if items:
         for it in items:
-            yield _norm_rss_item(it)
+            yield _norm_rss_item(it, **opts)
         return
 
     # Fallback RSS-ish
     items = root.findall(".//item")
     if items:
         for it in items:
-            yield _norm_rss_item(it)
+            yield _norm_rss_item(it, **opts)
         return
 
     # Atom 1.0 (namespace-aware or wildcard)
@@ -105,15 +211,99 @@ def parse_feed(xml_bytes: bytes) -> Iterable[Dict[str, Any]]:
     )
     if entries:
         for en in entries:
-            yield _norm_atom_entry(en)
+            yield _norm_atom_entry(en, **opts)
         return
 
     return
 
 
+# -------- Pipeline stages (see campaignshare_fetcher.pipeline) --------
+def fetch_bytes(
+    url: str,
+    timeout: float = 20.0,
+    max_bytes: int | None = None,
+    reserve: Callable[[int], None] | None = None,
+) -> bytes:
+    # only pass what is set, so simpler _http_get stand-ins keep working
+    kw: dict[str, Any] = {}
+    if max_bytes is not None:
+        kw["max_bytes"] = max_bytes
+    if reserve is not None:
+        kw["reserve"] = reserve
+    return _http_get(url, timeout=timeout, **kw)
+
+
+def parse_bytes(
+    raw: bytes,
+    name: str,
+    url: str,
+    summary_chars: int = SUMMARY_CHARS,
+    summary_from: Sequence[str] = SUMMARY_FROM,
+) -> list[Dict[str, Any]]:
+    return list(parse_feed(raw, summary_chars, summary_from))
+
+
 def run(
-    source_name: str, url: str, output_path: str, state_dir: str = "data/state"
+    source_name: str,
+    url: str,
+    output_path: str,
+    state_dir: str = "data/state",
+    timeout: float = 20.0,
+    journal: Any | None = None,
+    dedupe: Any | None = None,
+    summary_chars: int = SUMMARY_CHARS,
+    summary_from: Sequence[str] = SUMMARY_FROM,
+) -> dict:
+    # Fetch + parse (or reuse what an interrupted run already fetched)
+    items = journal.load_spool(source_name) if journal is not None else None
+    n_bytes = None
+    if items is None:
+        try:
+            xml = _http_get(url, timeout=timeout)
+        except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError) as e:
+            return {"ok": False, "error": f"http error: {e}"}
+        n_bytes = len(xml)
+        items = list(parse_feed(xml, summary_chars, summary_from))
+        if journal is not None:
+            journal.save_spool(source_name, items)
+
+    res = write_items(
+        source_name, items, output_path, state_dir, journal=journal, dedupe=dedupe
+    )
+    if n_bytes is not None:
+        res["bytes"] = n_bytes
+    return res
+
+
+def ingest(
+    source_name: str,
+    xml: bytes,
+    output_path: str,
+    state_dir: str = "data/state",
+    dedupe: Any | None = None,
+    summary_chars: int = SUMMARY_CHARS,
+    summary_from: Sequence[str] = SUMMARY_FROM,
+) -> dict:
+    """Parse a feed body obtained elsewhere (e.g. a WebSub push) and write it."""
+    try:
+        items = list(parse_feed(xml, summary_chars, summary_from))
+    except ET.ParseError as e:
+        return {"ok": False, "error": f"parse error: {e}"}
+    return write_items(source_name, items, output_path, state_dir, dedupe=dedupe)
+
+
+def write_items(
+    source_name: str,
+    items: list[Dict[str, Any]],
+    output_path: str,
+    state_dir: str = "data/state",
+    journal: Any | None = None,
+    dedupe: Any | None = None,
 ) -> dict:
+    """
+    Dedupe ``items`` against the source's state (and, with ``dedupe``, the
+    shared canonical-URL index) and append the new ones.
+    """
     # Load state
     state_p = Path(state_dir) / f"{source_name}.json"
     seen: set[str] = set()
@@ -123,25 +313,42 @@ def run(
         except Exception:
             seen = set()
 
-    # Fetch + parse
-    try:
-        xml = _http_get(url)
-    except (urllib.error.URLError, urllib.error.HTTPError) as e:
-        return {"ok": False, "error": f"http error: {e}"}
-
-    items = list(parse_feed(xml))
+    recovered: set[str] = set()
+    if journal is not None:
+        recovered = journal.persisted_ids(source_name) - seen
+        seen |= recovered
     new_items = [it for it in items if it["id"] not in seen]
 
-    # Append JSONL
+    dupes = 0
+    if dedupe is not None:
+        fresh = dedupe.filter(new_items)
+        dupes = len(new_items) - len(fresh)
+        seen.update(it["id"] for it in new_items)
+        new_items = fresh
+
+    # Append to the output sink (JSONL unless the extension says otherwise)
     out_p = Path(output_path)
-    out_p.parent.mkdir(parents=True, exist_ok=True)
-    with out_p.open("a", encoding="utf-8") as f:
-        for it in new_items:
-            f.write(json.dumps(it, ensure_ascii=False) + "\n")
+    try:
+        with open_sink(output_path, source=source_name) as sink:
+            sink.write(new_items)
+    except BaseException:
+        if dedupe is not None:
+            dedupe.discard(new_items)  # not written: let a later run claim them
+        raise
+    if dedupe is not None:
+        dedupe.commit(new_items)
 
     # Update state
     state_p.parent.mkdir(parents=True, exist_ok=True)
     seen.update(it["id"] for it in new_items)
     state_p.write_text(json.dumps({"seen_ids": sorted(seen)}))
 
-    return {"ok": True, "total": len(items), "new": len(new_items), "path": str(out_p)}
+    res = {
+        "ok": True,
+        "total": len(items),
+        "new": len(new_items) + len(recovered),
+        "path": str(out_p),
+    }
+    if dedupe is not None:
+        res["dupes"] = dupes
+    return res
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+INDEX_FILE = "_urls.idx"
+
+# Query parameters that only identify the referrer/campaign, never the content.
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "msclkid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "_hsenc",
+    "_hsmi",
+    "ref",
+    "ref_src",
+    "ref_url",
+    "share_id",
+    "si",
+    "spm",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+REDDIT_HOSTS = {
+    "reddit.com",
+    "www.reddit.com",
+    "old.reddit.com",
+    "new.reddit.com",
+    "np.reddit.com",
+    "m.reddit.com",
+    "i.reddit.com",
+}
+_REDDIT_POST = re.compile(r"^(?:/r/[^/]+)?/comments/([a-z0-9]+)(?:/|$)", re.I)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL for cross-source comparison: http(s) scheme and host case,
+    default ports, fragments, tracking parameters, query order and trailing
+    slashes are ignored; reddit hosts, ``redd.it`` shortlinks and subreddit
+    permalinks all collapse to ``https://www.reddit.com/comments/<id>``.
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    if url.startswith("/r/") or url.startswith("/comments/"):
+        url = "https://www.reddit.com" + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+    host = (parts.hostname or "").lower()
+    port = parts.port if parts.port not in (None, 80, 443) else None
+
+    if host == "redd.it" and parts.path.strip("/"):
+        return f"https://www.reddit.com/comments/{parts.path.strip('/').lower()}"
+    if host in REDDIT_HOSTS:
+        m = _REDDIT_POST.match(parts.path)
+        if m:
+            return f"https://www.reddit.com/comments/{m.group(1).lower()}"
+        host = "www.reddit.com"
+
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS
+        and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/")
+    netloc = f"{host}:{port}" if port else host
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+def item_keys(it: dict[str, Any]) -> set[str]:
+    """Canonical URLs an item is known by (its link and, for reddit, the post)."""
+    keys = {canonicalize_url(str(it.get(k) or "")) for k in ("url", "permalink")}
+    keys.discard("")
+    return keys
+
+
+class UrlIndex:
+    """
+    Shared, append-only index of canonical URLs already written by any source
+    that opts in with ``global_dedupe = true``. Stores a short hash per URL in
+    ``<state_dir>/_urls.idx``.
+
+    ``filter()`` claims the URLs of the items it lets through, so concurrent
+    sources see them as taken; the adapter then ``commit()``s the items it
+    wrote, or ``discard()``s them if the write failed so a later run can
+    still write them.
+    """
+
+    def __init__(self, state_dir: str = "data/state"):
+        self.path = Path(state_dir) / INDEX_FILE
+        self._keys: set[str] = set()
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with self.path.open(encoding="ascii", errors="ignore") as f:
+                self._keys = {ln.strip() for ln in f if ln.strip()}
+
+    @staticmethod
+    def _h(key: str) -> str:
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+    def _hashes(self, items: Iterable[dict[str, Any]]) -> set[str]:
+        return {self._h(k) for it in items for k in item_keys(it)}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def claim(self, it: dict[str, Any]) -> bool:
+        """True if no other item claimed any of ``it``'s URLs yet (and claim them)."""
+        hs = self._hashes([it])
+        if not hs:
+            return True
+        with self._lock:
+            if hs & self._keys:
+                return False
+            self._keys |= hs
+        return True
+
+    def filter(self, items: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [it for it in items if self.claim(it)]
+
+    def commit(self, items: Iterable[dict[str, Any]]) -> None:
+        """Persist the claims of ``items`` (returned by ``filter``, now written)."""
+        hs = self._hashes(items)
+        if not hs:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, self.path.open("a", encoding="ascii") as f:
+            f.write("".join(h + "\n" for h in sorted(hs)))
+
+    def discard(self, items: Iterable[dict[str, Any]]) -> None:
+        """Release the claims of ``items`` (returned by ``filter``, not written)."""
+        hs = self._hashes(items)
+        with self._lock:
+            self._keys -= hs
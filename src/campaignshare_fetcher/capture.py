@@ -0,0 +1,228 @@
+"""
+Record/replay of adapter HTTP traffic for offline load testing.
+
+``record(path)`` captures every response the adapters fetch (body, status,
+headers, latency) into a zip archive; ``replay(path, scale)`` serves that
+archive from a local stand-in server with the original (or scaled) latencies
+and points the adapters at it, so a production config can be re-run with no
+network while still going through the real HTTP/parse/write code.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zipfile
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterator
+
+from .adapters import reddit_json, rss
+
+LOG = logging.getLogger("campaignshare.capture")
+
+INDEX = "index.json"
+# hop-by-hop, re-generated by the replay server, or no longer true once the
+# body is stored decoded
+_DROP_HEADERS = {
+    "connection",
+    "content-encoding",
+    "content-length",
+    "date",
+    "server",
+    "transfer-encoding",
+}
+
+
+class Archive:
+    """Zip archive of responses; identical bodies are stored once."""
+
+    def __init__(self) -> None:
+        self.entries: list[dict[str, Any]] = []
+        self.bodies: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self, url: str, status: int, headers: Any, body: bytes, elapsed: float
+    ) -> None:
+        digest = hashlib.sha1(body).hexdigest()
+        hdrs = dict(headers.items()) if headers is not None else {}
+        with self._lock:
+            self.bodies.setdefault(digest, body)
+            self.entries.append(
+                {
+                    "url": url,
+                    "status": int(status),
+                    "headers": hdrs,
+                    "elapsed": round(elapsed, 6),
+                    "body": digest,
+                }
+            )
+
+    def save(self, path: str) -> None:
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(INDEX, json.dumps(self.entries))
+            for digest, body in self.bodies.items():
+                zf.writestr(f"bodies/{digest}", body)
+
+    @classmethod
+    def load(cls, path: str) -> Archive:
+        a = cls()
+        with zipfile.ZipFile(path) as zf:
+            a.entries = json.loads(zf.read(INDEX))
+            for e in a.entries:
+                if e["body"] not in a.bodies:
+                    a.bodies[e["body"]] = zf.read(f"bodies/{e['body']}")
+        return a
+
+
+# ----------------------------
+# Record
+# ----------------------------
+@contextmanager
+def record(path: str) -> Iterator[Archive]:
+    """Capture adapter HTTP traffic into the archive at ``path``."""
+    archive = Archive()
+    orig_http_get, orig_get = rss._http_get, reddit_json.requests.get
+
+    def http_get(
+        url: str,
+        timeout: float = 20.0,
+        max_bytes: int | None = None,
+        reserve: Callable[[int], None] | None = None,
+    ) -> bytes:
+        req = urllib.request.Request(url, headers={"User-Agent": rss.UA})
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                body = rss._read_capped(resp, max_bytes, reserve)
+                archive.add(
+                    url, resp.status, resp.headers, body, time.perf_counter() - t0
+                )
+                return body
+        except urllib.error.HTTPError as e:
+            archive.add(url, e.code, e.headers, e.read(), time.perf_counter() - t0)
+            raise
+
+    def get(url: str, *args: Any, **kwargs: Any) -> Any:
+        t0 = time.perf_counter()
+        resp = orig_get(url, *args, **kwargs)
+        archive.add(
+            url, resp.status_code, resp.headers, resp.content, time.perf_counter() - t0
+        )
+        return resp
+
+    rss._http_get, reddit_json.requests.get = http_get, get
+    try:
+        yield archive
+    finally:
+        rss._http_get, reddit_json.requests.get = orig_http_get, orig_get
+        archive.save(path)
+        LOG.info("recorded %d responses → %s", len(archive.entries), path)
+
+
+# ----------------------------
+# Replay
+# ----------------------------
+class ReplayServer:
+    """
+    Local stand-in for every origin in an archive. ``GET /r?u=<url>`` answers
+    with the recorded response for ``url`` after ``elapsed * scale`` seconds;
+    repeated requests walk through that URL's recordings (the last repeats).
+    """
+
+    def __init__(self, archive: Archive, scale: float = 1.0, host: str = "127.0.0.1"):
+        self.archive = archive
+        self.scale = scale
+        self.served = 0
+        self._by_url: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for e in archive.entries:
+            self._by_url[e["url"]].append(e)
+        self._next: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, 0), _replay_handler(self))
+        self.base = "http://%s:%d" % self._httpd.server_address[:2]
+
+    def url_for(self, url: str) -> str:
+        return f"{self.base}/r?u={urllib.parse.quote(url, safe='')}"
+
+    def lookup(self, url: str) -> dict[str, Any] | None:
+        with self._lock:
+            recs = self._by_url.get(url)
+            if not recs:
+                return None
+            i = min(self._next[url], len(recs) - 1)
+            self._next[url] += 1
+            self.served += 1
+            return recs[i]
+
+    def start(self) -> None:
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def _replay_handler(srv: ReplayServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server API
+            q = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+            e = srv.lookup(q.get("u", [""])[0])
+            if e is None:
+                body, status, headers, delay = b"not recorded", 404, {}, 0.0
+            else:
+                body = srv.archive.bodies[e["body"]]
+                status, headers = e["status"], e["headers"]
+                delay = e["elapsed"] * srv.scale
+            if delay > 0:
+                time.sleep(delay)
+            self.send_response(status)
+            for k, v in headers.items():
+                if k.lower() not in _DROP_HEADERS:
+                    self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            LOG.debug("replay %s", fmt % args)
+
+    return Handler
+
+
+@contextmanager
+def replay(path: str, scale: float = 1.0) -> Iterator[ReplayServer]:
+    """Serve the archive at ``path`` locally and route adapter HTTP to it."""
+    srv = ReplayServer(Archive.load(path), scale=scale)
+    orig_http_get, orig_get = rss._http_get, reddit_json.requests.get
+
+    def http_get(
+        url: str,
+        timeout: float = 20.0,
+        max_bytes: int | None = None,
+        reserve: Callable[[int], None] | None = None,
+    ) -> bytes:
+        return orig_http_get(
+            srv.url_for(url), timeout=timeout, max_bytes=max_bytes, reserve=reserve
+        )
+
+    def get(url: str, *args: Any, **kwargs: Any) -> Any:
+        return orig_get(srv.url_for(url), *args, **kwargs)
+
+    srv.start()
+    rss._http_get, reddit_json.requests.get = http_get, get
+    try:
+        yield srv
+    finally:
+        rss._http_get, reddit_json.requests.get = orig_http_get, orig_get
+        srv.stop()
@@ -3,10 +3,31 @@ from __future__ import annotations
 
 import argparse
 import logging
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any, Iterable
-
-from .config import load_config
+from typing import Any, Iterable, Iterator
+
+from .canonical import UrlIndex
+from .config import ConfigLoader, load_config
+from .estimate import (
+    SLOW_SECONDS,
+    SourceCost,
+    estimate_run,
+    fmt_bytes,
+    source_cost,
+)
+from .journal import RunJournal
+from .pipeline import Job, MemoryBudget, call_accepting, run_staged
+from .schedule import Budget, order_sources
+from .stats import (
+    expected_bytes,
+    expected_seconds,
+    load_stats,
+    record_run,
+    save_stats,
+)
+from .text import summary_options
 
 # Optional imports (adapters registry is preferred; fall back gracefully)
 try:
@@ -18,6 +39,9 @@ except Exception:  # pragma: no cover - tolerate partial installs during bootstr
 
 LOG = logging.getLogger("campaignshare.cli")
 
+DEFAULT_TIMEOUT = 20.0
+DEFAULT_OUTPUT = "data/output.jsonl"
+
 
 # ----------------------------
 # Parsing / CLI surface
@@ -37,18 +61,122 @@ def build_parser() -> argparse.ArgumentParser:
     sub = p.add_subparsers(dest="cmd")
 
     # plan (dry-run)
-    pp = sub.add_parser("plan", help="Show what would be fetched (no writes).")
+    pp = sub.add_parser(
+        "plan", help="Show what would be fetched and what it should cost (no writes)."
+    )
     _add_common_source_flags(pp)
+    pp.add_argument(
+        "--state-dir",
+        default="data/state",
+        help="Where run statistics live (default: data/state).",
+    )
+    pp.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Concurrency to estimate the next run's wall time for (default: 1).",
+    )
+    pp.add_argument(
+        "--slow-seconds",
+        type=float,
+        default=SLOW_SECONDS,
+        help=f"Flag sources whose median run takes this long (default: {SLOW_SECONDS:g}).",
+    )
 
     # run (fetch + write/dedupe)
     pr = sub.add_parser("run", help="Fetch and write outputs (with dedupe).")
     _add_common_source_flags(pr)
+    pr.add_argument(
+        "--time-budget",
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "Wall-clock budget; stalest sources go first, the rest are deferred. "
+            "Started sources get the remaining budget as their per-read timeout."
+        ),
+    )
+    pr.add_argument(
+        "--state-dir",
+        default="data/state",
+        help="Where dedupe state and run statistics live (default: data/state).",
+    )
+    cap = pr.add_mutually_exclusive_group()
+    cap.add_argument(
+        "--record",
+        metavar="ARCHIVE",
+        help="Capture every HTTP response of this run into a zip archive.",
+    )
+    cap.add_argument(
+        "--replay",
+        metavar="ARCHIVE",
+        help="Serve HTTP from a recorded archive via a local stand-in server.",
+    )
+    pr.add_argument(
+        "--replay-scale",
+        type=float,
+        default=1.0,
+        help="Multiply recorded latencies when replaying (0 = no delay).",
+    )
+    pr.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run: skip finished sources, reuse fetched items.",
+    )
+    pr.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Fetch N sources at once through the staged pipeline (default: 1).",
+    )
+    pr.add_argument(
+        "--memory-budget",
+        type=_parse_size,
+        metavar="SIZE",
+        help="Cap response bytes in flight, e.g. 64M (implies the staged pipeline).",
+    )
+
+    # serve (long-running: WebSub push where hubs exist, polling otherwise)
+    ps = sub.add_parser(
+        "serve", help="Receive WebSub pushes; poll sources without a hub."
+    )
+    ps.add_argument("--config", "-c", required=True, help="Path to TOML config file.")
+    ps.add_argument("--host", default="127.0.0.1", help="Bind address.")
+    ps.add_argument("--port", type=int, default=8080, help="Bind port.")
+    ps.add_argument(
+        "--callback-url",
+        help="Public base URL hubs call back (default: http://HOST:PORT).",
+    )
+    ps.add_argument(
+        "--poll-interval",
+        type=float,
+        default=300.0,
+        help="Seconds between polls of sources without push (default: 300).",
+    )
+    ps.add_argument(
+        "--state-dir",
+        default="data/state",
+        help="Where dedupe state lives (default: data/state).",
+    )
 
     # export (merge recent items into one JSON list)
     pe = sub.add_parser("export", help="Merge recent items across data/*.jsonl.")
     pe.add_argument("--config", "-c", required=True, help="Path to TOML config file.")
     pe.add_argument("--limit", type=int, default=200, help="Max items in export.")
-    pe.add_argument("--out", required=True, help="Output JSON file path.")
+    pe.add_argument(
+        "--out",
+        help="Output file path (JSON list; NDJSON with --consumer, '-' for stdout).",
+    )
+    pe.add_argument(
+        "--consumer",
+        help="Export only items appended since this consumer's last export.",
+    )
+    pe.add_argument(
+        "--state-dir",
+        default="data/state",
+        help="Where consumer cursors live (default: data/state).",
+    )
 
     # Legacy (no subcommand): keep old behavior
     p.add_argument("--config", "-c", help="(legacy) Path to TOML config file.")
@@ -93,6 +221,20 @@ def _parse_since(s: str | None) -> datetime | None:
     return dt.astimezone(timezone.utc)
 
 
+def _parse_size(s: str) -> int:
+    """``"512K"``/``"64M"``/``"1G"``/plain bytes -> bytes."""
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3}
+    t = s.strip().upper().removesuffix("B") or "0"
+    mult = units.get(t[-1], 1)
+    try:
+        n = float(t[:-1] if t[-1] in units else t)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a size: {s!r}")
+    if n <= 0:
+        raise argparse.ArgumentTypeError(f"size must be positive: {s!r}")
+    return int(n * mult)
+
+
 def _adapter_for(type_name: str):
     key = (type_name or "").lower().strip()
     mod = ADAPTERS.get(key)
@@ -108,66 +250,269 @@ def _supports(mod: Any, fn: str) -> bool:
 # ----------------------------
 # Commands
 # ----------------------------
-def cmd_plan(config_path: str, since: str | None) -> int:
-    cfg = load_config(config_path)
+def cmd_plan(
+    config_path: str,
+    since: str | None,
+    state_dir: str = "data/state",
+    concurrency: int = 1,
+    slow_seconds: float = SLOW_SECONDS,
+) -> int:
+    # plan writes nothing: a cache left by run is used, not refreshed
+    cfg = load_config(config_path, cache_dir=state_dir, write_cache=False)
     since_dt = _parse_since(since)
+    stats = load_stats(state_dir)
 
+    costs = []
     for s in cfg.sources:
         out = s.options.get("output", "(no output)")
         extra = f" since={since_dt.isoformat()}" if since_dt else ""
         print(f"plan: {s.type}:{s.name} -> {out}{extra}")
+        c = source_cost(stats, s.name, slow_seconds)
+        costs.append(c)
+        for line in _cost_lines(c):
+            print(f"      {line}")
+
+    est = estimate_run(costs, max(1, concurrency))
+    if est.unknown == est.sources:
+        print(f"estimate: no run history in {state_dir} yet")
+        return 0
+    assumed = f", {est.unknown} without history" if est.unknown else ""
+    rate = f" (~{fmt_bytes(est.bytes / est.wall)}/s)" if est.wall > 0 else ""
+    print(
+        f"estimate: {est.sources} source(s){assumed} at concurrency "
+        f"{est.concurrency}: ~{est.wall:.1f}s wall (p95 {est.wall_p95:.1f}s, "
+        f"serial {est.serial:.1f}s), {fmt_bytes(est.bytes)}{rate}, "
+        f"~{est.items:.0f} items (~{est.new:.0f} new)"
+    )
+    for flag, label in (
+        ("slow", f"slow (median >= {slow_seconds:g}s)"),
+        ("never-new", "never new"),
+        ("failing", "failing"),
+    ):
+        names = [c.name for c in costs if flag in c.flags]
+        if names:
+            print(f"flagged {label}: {', '.join(names)}")
     return 0
 
 
-def cmd_run(config_path: str, since: str | None) -> int:
-    cfg = load_config(config_path)
+def _cost_lines(c: SourceCost) -> list[str]:
+    if not c.runs:
+        return ["no history yet"]
+    parts = []
+    if c.p50 is not None:
+        parts.append(f"p50 {c.p50:.1f}s p95 {c.p95:.1f}s")
+    if c.bytes is not None:
+        parts.append(fmt_bytes(c.bytes))
+    if c.items is not None:
+        parts.append(f"{c.items:.0f} items/run")
+    if c.new_rate is not None:
+        parts.append(f"{c.new_rate:.0%} new")
+    parts.append(f"{c.runs} runs" + (f", {c.failures} failed" if c.failures else ""))
+    lines = [" · ".join(parts)]
+    if c.last_error:
+        lines.append(f"last error: {c.last_error}")
+    if c.flags:
+        lines.append("! " + ", ".join(c.flags))
+    return lines
+
+
+def cmd_run(
+    config_path: str,
+    since: str | None,
+    time_budget: float | None = None,
+    state_dir: str = "data/state",
+    resume: bool = False,
+    concurrency: int = 1,
+    memory_budget: int | None = None,
+) -> int:
+    cfg = load_config(config_path, cache_dir=state_dir)
     since_dt = _parse_since(since)
+    stats = load_stats(state_dir)
+    journal = RunJournal.open(state_dir, config_path, resume=resume)
+    if resume and not journal.resumed:
+        print("resume: no interrupted run for this config; starting fresh")
+
+    sources = cfg.sources
+    budget: Budget | None = None
+    if time_budget is not None:
+        sources = order_sources(sources, stats)
+        budget = Budget(time_budget)
+
+    url_index = _url_index_for(sources, state_dir)
+    deferred: list[str] = []
+    was_deferred = set(stats.get("deferred", []))
+    head = [True]  # the next source to be considered is the first one
+
+    def admit(s: Any) -> Job | None:
+        if journal.is_done(s.name):
+            print(f"skip {s.name}: finished before interruption")
+            return None
+        first, head[0] = head[0], False
+        timeout = float(s.options.get("timeout", DEFAULT_TIMEOUT))
+        if budget is not None:
+            # A source whose usual run is longer than the whole budget would
+            # be deferred forever; once it heads the queue it gets its turn,
+            # clipped to the budget like any other.
+            expected = (
+                0.0
+                if first and s.name in was_deferred
+                else expected_seconds(stats, s.name)
+            )
+            if not budget.can_start(expected):
+                deferred.append(s.name)
+                print(f"defer {s.name}: time budget ({budget.remaining():.1f}s left)")
+                return None
+            timeout = budget.deadline_for(timeout)
+        job = _prepare(
+            s,
+            since_dt,
+            timeout=timeout,
+            state_dir=state_dir,
+            journal=journal,
+            dedupe=url_index if s.options.get("global_dedupe") else None,
+        )
+        if job is None:
+            return None
+        job.estimate = expected_bytes(stats, s.name, job.estimate)
+        if job.max_bytes is not None:
+            job.estimate = min(job.estimate, job.max_bytes)
+        journal.begin(s.name, job.out_path)
+        job.started = time.monotonic()
+        return job
+
+    def finish(job: Job, res: dict[str, Any] | None) -> None:
+        _report(job, res)
+        if res is not None:
+            record_run(stats, job.source.name, res, time.monotonic() - job.started)
+            if res.get("ok"):
+                journal.done(job.source.name)
+
+    if concurrency > 1 or memory_budget is not None:
+        mem = run_staged(
+            sources,
+            admit,
+            finish,
+            _run_job,
+            concurrency=concurrency,
+            memory=MemoryBudget(memory_budget),
+        )
+        LOG.info("run: peak %d bytes in flight", mem.peak)
+    else:
+        for s in sources:
+            job = admit(s)
+            if job is not None:
+                finish(job, _run_job(job))
+
+    stats["deferred"] = deferred
+    save_stats(state_dir, stats)
+    journal.finish()
+    if deferred:
+        print(f"deferred {len(deferred)} source(s): {', '.join(deferred)}")
+    return 0
 
-    for s in cfg.sources:
+
+def _url_index_for(sources: list[Any], state_dir: str) -> UrlIndex | None:
+    """Shared canonical-URL index, loaded only if some source opts in."""
+    if any(s.options.get("global_dedupe") for s in sources):
+        return UrlIndex(state_dir)
+    return None
+
+
+def _run_source(s: Any, since_dt: datetime | None, **extra: Any) -> dict | None:
+    """Run one source; returns the adapter result, or None if nothing ran."""
+    job = _prepare(s, since_dt, **extra)
+    if job is None:
+        return None
+    res = _run_job(job)
+    _report(job, res)
+    return res
+
+
+def _prepare(s: Any, since_dt: datetime | None, **extra: Any) -> Job | None:
+    """Resolve a source's adapter, url and output; None (after a skip line) if unusable."""
+    try:
+        mod = _adapter_for(s.type)
+    except SystemExit as e:
+        print(f"skip {s.name}: {e}")
+        return None
+
+    url = s.options.get("url")
+    out_path = s.options.get("output", DEFAULT_OUTPUT)
+    if not url:
+        print(f"skip {s.name}: missing 'url'")
+        return None
+    if not _supports(mod, "run") and not _supports(mod, "fetch"):
+        print(f"skip {s.name}: adapter lacks run()/fetch()")
+        return None
+    try:
+        summary = summary_options(s.name, s.options)
+    except ValueError as e:
+        print(f"skip {e}")
+        return None
+    max_bytes = s.options.get("max_bytes")
+    return Job(
+        source=s,
+        mod=mod,
+        url=url,
+        out_path=out_path,
+        extra={"since": since_dt, **summary, **extra},
+        max_bytes=int(max_bytes) if max_bytes else None,
+    )
+
+
+def _run_job(job: Job) -> dict[str, Any] | None:
+    """Run a prepared source in one go (the non-staged path)."""
+    s, mod = job.source, job.mod
+    # Preferred adapter contract: run(name, url, out_path, since: datetime|None) -> dict
+    if _supports(mod, "run"):
+        extra = {k: v for k, v in job.extra.items() if k != "since"}
         try:
-            mod = _adapter_for(s.type)
-        except SystemExit as e:
-            print(f"skip {s.name}: {e}")
-            continue
-
-        url = s.options.get("url")
-        out_path = s.options.get("output", "data/output.jsonl")
-        if not url:
-            print(f"skip {s.name}: missing 'url'")
-            continue
-
-        # Preferred adapter contract: run(name, url, out_path, since: datetime|None) -> dict
-        if _supports(mod, "run"):
-            try:
-                res: dict[str, Any] = mod.run(s.name, url, out_path, since_dt)  # type: ignore[attr-defined]
-            except TypeError:
-                # Older signature without since
-                res = mod.run(s.name, url, out_path)  # type: ignore[attr-defined]
-        # Fallback: fetch(url, name) -> Iterable[dict]; we handle writing/dedupe nowhere (plan-only info)
-        elif _supports(mod, "fetch"):
-            try:
-                items: Iterable[dict[str, Any]] = mod.fetch(url=url, name=s.name)  # type: ignore[attr-defined]
-            except Exception as exc:  # runtime fetch failure
-                print(f"err {s.name}: {exc}")
-                continue
-            count = 0
-            cutoff = since_dt.timestamp() if since_dt else None
-            for it in items:
-                count += 1 if (not cutoff or _passes_since(it, cutoff)) else 0
-            print(f"ok  {s.name}: {count} items (fetch-only; no write path wired)")
-            continue
-        else:
-            print(f"skip {s.name}: adapter lacks run()/fetch()")
-            continue
-
-        if res.get("ok"):
-            new = res.get("new", "?")
-            total = res.get("total", "?")
-            path = res.get("path", out_path)
-            print(f"ok  {s.name}: {new}/{total} new → {path}")
-        else:
-            print(f"err {s.name}: {res.get('error')}")
-    return 0
+            return _call_run(
+                mod, s.name, job.url, job.out_path, job.extra.get("since"), **extra
+            )
+        except Exception as exc:  # e.g. socket timeout past the deadline
+            return {"ok": False, "error": str(exc)}
+    # Fallback: fetch(url, name) -> Iterable[dict]; we handle writing/dedupe nowhere (plan-only info)
+    try:
+        items: Iterable[dict[str, Any]] = mod.fetch(url=job.url, name=s.name)  # type: ignore[attr-defined]
+    except Exception as exc:  # runtime fetch failure
+        print(f"err {s.name}: {exc}")
+        return None
+    count = 0
+    since_dt = job.extra.get("since")
+    cutoff = since_dt.timestamp() if since_dt else None
+    for it in items:
+        count += 1 if (not cutoff or _passes_since(it, cutoff)) else 0
+    print(f"ok  {s.name}: {count} items (fetch-only; no write path wired)")
+    return None
+
+
+def _report(job: Job, res: dict[str, Any] | None) -> None:
+    if res is None:
+        return
+    if res.get("ok"):
+        new = res.get("new", "?")
+        total = res.get("total", "?")
+        path = res.get("path", job.out_path)
+        dupes = f" ({res['dupes']} cross-source dupes)" if res.get("dupes") else ""
+        print(f"ok  {job.source.name}: {new}/{total} new → {path}{dupes}")
+    else:
+        print(f"err {job.source.name}: {res.get('error')}")
+
+
+def _call_run(
+    mod: Any,
+    name: str,
+    url: str,
+    out_path: str,
+    since_dt: datetime | None,
+    **extra: Any,
+) -> dict[str, Any]:
+    """
+    Call ``mod.run`` passing only the optional keywords it declares, so older
+    adapters (no ``since``, no ``timeout``) keep working.
+    """
+    return call_accepting(mod.run, name, url, out_path, since=since_dt, **extra)
 
 
 def _passes_since(item: dict[str, Any], cutoff_ts: float) -> bool:
@@ -183,11 +528,83 @@ def _passes_since(item: dict[str, Any], cutoff_ts: float) -> bool:
         return False
 
 
-def cmd_export(config_path: str, limit: int, out_path: str) -> int:
+def cmd_serve(
+    config_path: str,
+    host: str,
+    port: int,
+    callback_url: str | None,
+    poll_interval: float,
+    state_dir: str = "data/state",
+) -> int:
+    from .websub import PushReceiver, serve
+
+    loader = ConfigLoader(config_path, cache_dir=state_dir)
+    cfg = loader.load()
+    url_index = _url_index_for(cfg.sources, state_dir)
+    receiver = PushReceiver(
+        host, port, callback_url, state_dir=state_dir, url_index=url_index
+    )
+    print(f"serve: callbacks at {receiver.callback_base}/websub/")
+
+    def poll(s: Any) -> Any:
+        dedupe = url_index if s.options.get("global_dedupe") else None
+        return _run_source(s, None, state_dir=state_dir, dedupe=dedupe)
+
+    try:
+        serve(
+            cfg.sources,
+            poll,
+            receiver,
+            poll_interval=poll_interval,
+            reload=loader.reload,
+        )
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_export(
+    config_path: str,
+    limit: int,
+    out_path: str | None,
+    consumer: str | None = None,
+    state_dir: str = "data/state",
+) -> int:
     # Import lazily to avoid circulars; modules expected in project already
-    from .export import merge_recent_to_json  # your existing util (expected)
+    from .export import export_delta, merge_recent_to_json
 
-    return merge_recent_to_json(config_path, limit, out_path)  # should print/log itself
+    if consumer:
+        try:
+            return export_delta(config_path, consumer, out_path, state_dir)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    if not out_path or out_path == "-":
+        raise SystemExit("export: --out is required (or use --consumer)")
+    return merge_recent_to_json(
+        config_path, limit, out_path, state_dir
+    )  # should print/log itself
+
+
+@contextmanager
+def _capture(
+    record_path: str | None, replay_path: str | None, scale: float = 1.0
+) -> Iterator[None]:
+    """Wrap a run in HTTP record or replay mode (no-op when neither is set)."""
+    if not record_path and not replay_path:
+        yield
+        return
+    from . import capture
+
+    started = time.perf_counter()
+    if record_path:
+        with capture.record(record_path) as archive:
+            yield
+        print(f"record: {len(archive.entries)} responses → {record_path}")
+    else:
+        with capture.replay(replay_path, scale) as srv:  # type: ignore[arg-type]
+            yield
+        wall = time.perf_counter() - started
+        print(f"replay: {srv.served} responses served in {wall:.2f}s (scale={scale})")
 
 
 # ----------------------------
@@ -208,11 +625,37 @@ def main(argv: list[str] | None = None) -> int:
 
     # Subcommand path
     if args.cmd == "plan":
-        return cmd_plan(args.config, args.since)
+        return cmd_plan(
+            args.config,
+            args.since,
+            args.state_dir,
+            args.concurrency,
+            args.slow_seconds,
+        )
     if args.cmd == "run":
-        return cmd_run(args.config, args.since)
+        with _capture(args.record, args.replay, args.replay_scale):
+            return cmd_run(
+                args.config,
+                args.since,
+                args.time_budget,
+                args.state_dir,
+                args.resume,
+                args.concurrency,
+                args.memory_budget,
+            )
+    if args.cmd == "serve":
+        return cmd_serve(
+            args.config,
+            args.host,
+            args.port,
+            args.callback_url,
+            args.poll_interval,
+            args.state_dir,
+        )
     if args.cmd == "export":
-        return cmd_export(args.config, args.limit, args.out)
+        return cmd_export(
+            args.config, args.limit, args.out, args.consumer, args.state_dir
+        )
 
     # legacy path (no subcommand)
     if not args.cmd and not args.config:
@@ -235,7 +678,7 @@ def main(argv: list[str] | None = None) -> int:
 
     # No config, no subcommand: keep a minimal friendly message
     print(
-        "campaignshare: provide a subcommand (plan/run/export) or --config with optional --run"
+        "campaignshare: provide a subcommand (plan/run/serve/export) or --config with optional --run"
     )
     # legacy path (no subcommand)
     if not args.cmd and not args.config:
@@ -1,8 +1,17 @@
 from __future__ import annotations
+import datetime as dt
+import glob
+import hashlib
+import itertools
+import json
+import os
 import tomllib
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from pathlib import Path
 from typing import Any
 
+CACHE_VERSION = 2
+
 
 @dataclass
 class Source:
@@ -16,24 +25,275 @@ class Config:
     sources: list[Source]
 
 
-def load_config(path: str) -> Config:
-    with open(path, "rb") as f:
-        data = tomllib.load(f)
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(base) / "campaignshare"
+
+
+def load_config(
+    path: str,
+    cache: bool = True,
+    cache_dir: str | os.PathLike | None = None,
+    write_cache: bool = True,
+) -> Config:
+    """
+    Load a TOML config file, or a directory of ``*.toml`` files.
+
+    Besides ``[[sources]]``, any file may declare ``include = [...]`` (paths or
+    globs relative to that file), ``[templates.NAME]`` tables and
+    ``[[groups]]`` that expand a template, e.g.::
+
+        [templates.subreddit]
+        type = "reddit_json"
+        name = "{sub}"
+        url = "https://www.reddit.com/r/{sub}/new.json"
+        output = "data/{sub}.jsonl"
+
+        [[groups]]
+        template = "subreddit"
+        expand = { sub = ["CityBuilding", "linux"] }
+
+    The compiled result is cached (as JSON) in ``cache_dir``, by default
+    ``$XDG_CACHE_HOME/campaignshare``, and reused until one of the files it was
+    built from changes (mtime/size). Nothing is written next to the config;
+    with ``write_cache=False`` a fresh cache is used but never (re)written.
+    """
+    return ConfigLoader(
+        path, cache=cache, cache_dir=cache_dir, write_cache=write_cache
+    ).load()
+
+
+class ConfigLoader:
+    """
+    Incremental config loader. ``load()`` only re-parses files whose mtime or
+    size changed since the previous call (or since the on-disk cache was
+    written) and only recompiles when something changed; long-running callers
+    keep one loader around and call ``reload()``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        cache: bool = True,
+        cache_dir: str | os.PathLike | None = None,
+        write_cache: bool = True,
+    ):
+        self.root = Path(path).resolve()
+        self.cache_path: Path | None = None
+        self._write = write_cache
+        # only the default cache dir is ours to create; an explicit one (the
+        # run's state dir) is used once it exists
+        self._make_cache_dir = cache_dir is None
+        if cache:
+            key = hashlib.sha1(str(self.root).encode("utf-8")).hexdigest()[:16]
+            base = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+            self.cache_path = base / f"_config.{key}.json"
+        # path -> ((mtime_ns, size), parsed toml)
+        self._files: dict[str, tuple[tuple[int, int], dict[str, Any]]] = {}
+        self._order: list[str] = []
+        self._config: Config | None = None
+        self._read_cache()
+
+    # ---- public ----
+    def load(self) -> Config:
+        self.reload()
+        assert self._config is not None
+        return self._config
+
+    def reload(self) -> Config | None:
+        """Return the new Config if any file changed since last time, else None."""
+        changed: list[bool] = []
+        order: list[str] = []
+        for p in self._roots():
+            self._visit(p, order, changed, stack=())
+        if self._config is not None and not any(changed) and order == self._order:
+            return None
+        config = _compile([(p, self._files[p][1]) for p in order])
+        self._files = {p: self._files[p] for p in order}
+        self._order, self._config = order, config
+        self._write_cache()
+        return self._config
+
+    # ---- discovery ----
+    def _roots(self) -> list[str]:
+        if self.root.is_dir():
+            return sorted(str(p) for p in self.root.glob("*.toml"))
+        return [str(self.root)]
+
+    def _visit(
+        self, p: str, order: list[str], changed: list[bool], stack: tuple[str, ...]
+    ) -> None:
+        if p in stack:
+            raise ValueError(f"include cycle: {' -> '.join((*stack, p))}")
+        if p in order:
+            return
+        data = self._parsed(p, changed)
+        order.append(p)
+        includes = data.get("include", [])
+        if isinstance(includes, str):
+            includes = [includes]
+        if not isinstance(includes, list):
+            raise ValueError(f"{p}: include must be a string or a list of strings")
+        base = os.path.dirname(p)
+        for pat in includes:
+            full = os.path.join(base, str(pat))
+            matches = sorted(glob.glob(full))
+            if not matches and not glob.has_magic(full):
+                raise ValueError(f"{p}: included file not found: {pat}")
+            for m in matches:
+                self._visit(os.path.realpath(m), order, changed, (*stack, p))
+
+    def _parsed(self, p: str, changed: list[bool]) -> dict[str, Any]:
+        st = os.stat(p)
+        stamp = (st.st_mtime_ns, st.st_size)
+        hit = self._files.get(p)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        with open(p, "rb") as f:
+            data = tomllib.load(f)
+        self._files[p] = (stamp, data)
+        changed.append(True)
+        return data
+
+    # ---- on-disk cache ----
+    def _read_cache(self) -> None:
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            blob = json.loads(
+                self.cache_path.read_text(encoding="utf-8"),
+                object_hook=_decode_toml_value,
+            )
+            if blob.get("version") != CACHE_VERSION or blob["root"] != str(self.root):
+                return
+            files = {p: (tuple(st), data) for p, (st, data) in blob["files"].items()}
+            config = Config(sources=[Source(**s) for s in blob["sources"]])
+            order = list(blob["order"])
+        except Exception:  # stale, foreign or corrupt cache: just re-parse
+            return
+        self._files, self._order, self._config = files, order, config
+
+    def _write_cache(self) -> None:
+        if self.cache_path is None or self._config is None or not self._write:
+            return
+        blob = {
+            "version": CACHE_VERSION,
+            "root": str(self.root),
+            "files": {p: [list(st), data] for p, (st, data) in self._files.items()},
+            "order": self._order,
+            "sources": [asdict(s) for s in self._config.sources],
+        }
+        tmp = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        try:
+            if self._make_cache_dir:
+                tmp.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(
+                json.dumps(blob, default=_encode_toml_value), encoding="utf-8"
+            )
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass  # no (writable) cache dir: still works, just uncached
 
-    raw_sources = data.get("sources")
-    if not isinstance(raw_sources, list) or not raw_sources:
+
+# TOML has date/time values JSON lacks; they are stored tagged and restored.
+_TOML_TYPES = {"datetime": dt.datetime, "date": dt.date, "time": dt.time}
+
+
+def _encode_toml_value(v: Any) -> Any:
+    for tag, cls in _TOML_TYPES.items():
+        if type(v) is cls:
+            return {"$toml": tag, "value": v.isoformat()}
+    raise TypeError(f"cannot cache {type(v).__name__} value")
+
+
+def _decode_toml_value(d: dict[str, Any]) -> Any:
+    cls = _TOML_TYPES.get(d.get("$toml")) if len(d) == 2 else None  # type: ignore[arg-type]
+    return cls.fromisoformat(d["value"]) if cls is not None else d
+
+
+# ----------------------------
+# Compilation
+# ----------------------------
+def _compile(files: list[tuple[str, dict[str, Any]]]) -> Config:
+    raw_sources: list[tuple[str, Any]] = []
+    templates: dict[str, dict[str, Any]] = {}
+    groups: list[tuple[str, Any]] = []
+
+    for p, data in files:
+        where = "" if len(files) == 1 else f"{p}: "
+        srcs = data.get("sources", [])
+        if not isinstance(srcs, list):
+            raise ValueError(f"{where}sources must be an array of tables")
+        raw_sources += [(f"{where}sources[{j}]", s) for j, s in enumerate(srcs)]
+        for name, t in (data.get("templates") or {}).items():
+            if name in templates:
+                raise ValueError(f"{where}template {name!r} defined twice")
+            if not isinstance(t, dict):
+                raise ValueError(f"{where}templates.{name} must be a table")
+            templates[name] = t
+        grps = data.get("groups", [])
+        if not isinstance(grps, list):
+            raise ValueError(f"{where}groups must be an array of tables")
+        groups += [(f"{where}groups[{j}]", g) for j, g in enumerate(grps)]
+
+    for where, g in groups:
+        raw_sources += _expand_group(where, g, templates)
+
+    if not raw_sources:
         raise ValueError("config must contain a non-empty [sources] array")
 
-    sources: list[Source] = []
-    for i, item in enumerate(raw_sources):
-        if not isinstance(item, dict):
-            raise ValueError(f"sources[{i}] must be a table")
-        name = item.get("name")
-        stype = item.get("type")
-        if not isinstance(name, str) or not name:
-            raise ValueError(f"sources[{i}].name must be a non-empty string")
-        if not isinstance(stype, str) or not stype:
-            raise ValueError(f"sources[{i}].type must be a non-empty string")
-        options = {k: v for k, v in item.items() if k not in ("name", "type")}
-        sources.append(Source(name=name, type=stype, options=options))
-    return Config(sources=sources)
+    return Config(sources=[_to_source(where, item) for where, item in raw_sources])
+
+
+def _expand_group(
+    where: str, g: Any, templates: dict[str, dict[str, Any]]
+) -> list[tuple[str, dict[str, Any]]]:
+    if not isinstance(g, dict):
+        raise ValueError(f"{where} must be a table")
+    tname = g.get("template")
+    if tname not in templates:
+        raise ValueError(f"{where}.template: unknown template {tname!r}")
+    expand = g.get("expand") or {}
+    if not isinstance(expand, dict) or not all(
+        isinstance(v, list) for v in expand.values()
+    ):
+        raise ValueError(f"{where}.expand must map names to lists")
+
+    base = {
+        **templates[tname],
+        **{k: v for k, v in g.items() if k not in ("template", "expand")},
+    }
+    keys = list(expand)
+    out: list[tuple[str, dict[str, Any]]] = []
+    for n, values in enumerate(itertools.product(*(expand[k] for k in keys))):
+        env = {k: str(v) for k, v in zip(keys, values)}
+        item = {k: _fill(f"{where}.{k}", v, env) for k, v in base.items()}
+        item.setdefault("name", "-".join(env.values()) or str(tname))
+        out.append((f"{where}[{n}]", item))
+    return out
+
+
+def _fill(where: str, v: Any, env: dict[str, str]) -> Any:
+    if isinstance(v, str):
+        try:
+            return v.format_map(env)
+        except (KeyError, ValueError, IndexError) as e:
+            raise ValueError(f"{where}: bad placeholder in {v!r}: {e}")
+    if isinstance(v, list):
+        return [_fill(where, x, env) for x in v]
+    return v
+
+
+def _to_source(where: str, item: Any) -> Source:
+    if not isinstance(item, dict):
+        raise ValueError(f"{where} must be a table")
+    name = item.get("name")
+    stype = item.get("type")
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"{where}.name must be a non-empty string")
+    if not isinstance(stype, str) or not stype:
+        raise ValueError(f"{where}.type must be a non-empty string")
+    options = {k: v for k, v in item.items() if k not in ("name", "type")}
+    return Source(name=name, type=stype, options=options)
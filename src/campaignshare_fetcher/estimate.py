@@ -0,0 +1,137 @@
+"""
+Cost estimates for ``plan``, derived from the run history in ``_stats.json``.
+
+Per source: latency percentiles, response size, items per run, share of new
+items and the last error; for the whole config: expected wall time (sources
+packed onto the workers longest-first), bandwidth and item volume.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import statistics
+from dataclasses import dataclass, field
+from typing import Any
+
+from .stats import history
+
+# Fewer runs than this say too little to flag a source.
+MIN_RUNS = 3
+SLOW_SECONDS = 10.0
+
+
+@dataclass
+class SourceCost:
+    name: str
+    runs: int = 0
+    failures: int = 0
+    p50: float | None = None
+    p95: float | None = None
+    bytes: float | None = None
+    items: float | None = None
+    new: float | None = None
+    new_rate: float | None = None
+    last_error: str | None = None
+    flags: list[str] = field(default_factory=list)
+
+
+@dataclass
+class RunEstimate:
+    concurrency: int
+    sources: int
+    unknown: int  # sources without history (assumed typical)
+    wall: float  # seconds, at median latencies
+    wall_p95: float  # seconds, if every source is as slow as its p95
+    serial: float  # sum of median latencies
+    bytes: float
+    items: float
+    new: float
+
+
+def percentile(xs: list[float], q: float) -> float:
+    """Linear-interpolated percentile (``q`` in 0..100) of a non-empty list."""
+    s = sorted(xs)
+    k = (len(s) - 1) * q / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def source_cost(
+    stats: dict[str, Any], name: str, slow_seconds: float = SLOW_SECONDS
+) -> SourceCost:
+    runs = history(stats, name)
+    c = SourceCost(name=name, runs=len(runs))
+    if not runs:
+        return c
+    ok = [h for h in runs if h.get("ok")]
+    c.failures = len(runs) - len(ok)
+    elapsed = [h["elapsed"] for h in runs if "elapsed" in h]
+    if elapsed:
+        c.p50, c.p95 = percentile(elapsed, 50), percentile(elapsed, 95)
+    sizes = [h["bytes"] for h in runs if "bytes" in h]
+    if sizes:
+        c.bytes = statistics.fmean(sizes)
+    totals = [h["total"] for h in ok if "total" in h]
+    if totals:
+        c.items = statistics.fmean(totals)
+    # the initial backfill (everything is new) says nothing about how often
+    # the source has news
+    steady = [h for h in ok if "new" in h and not h.get("initial")]
+    news = [h["new"] for h in steady]
+    if news:
+        c.new = statistics.fmean(news)
+        seen = sum(h.get("total", 0) for h in steady)
+        if seen:
+            c.new_rate = sum(news) / seen
+    c.last_error = stats.get("sources", {}).get(name, {}).get("last_error")
+
+    if len(elapsed) >= MIN_RUNS and c.p50 is not None and c.p50 >= slow_seconds:
+        c.flags.append("slow")
+    if len(news) >= MIN_RUNS and not any(news[-MIN_RUNS:]):
+        c.flags.append("never-new")
+    if len(runs) >= MIN_RUNS and not any(h.get("ok") for h in runs[-MIN_RUNS:]):
+        c.flags.append("failing")
+    return c
+
+
+def makespan(durations: list[float], workers: int) -> float:
+    """Wall time of running ``durations`` on ``workers``, longest first."""
+    loads = [0.0] * max(1, min(workers, len(durations)))
+    for d in sorted(durations, reverse=True):
+        heapq.heapreplace(loads, loads[0] + d)
+    return max(loads)
+
+
+def estimate_run(costs: list[SourceCost], concurrency: int = 1) -> RunEstimate:
+    """Expected cost of running every source in ``costs`` once."""
+    known = [c for c in costs if c.p50 is not None]
+    typical = statistics.median(c.p50 for c in known) if known else 0.0
+    typical95 = statistics.median(c.p95 for c in known) if known else 0.0
+    p50s = [c.p50 if c.p50 is not None else typical for c in costs]
+    p95s = [c.p95 if c.p95 is not None else typical95 for c in costs]
+
+    def total(attr: str) -> float:
+        xs = [getattr(c, attr) for c in costs if getattr(c, attr) is not None]
+        # sources without data are assumed to be average ones
+        return statistics.fmean(xs) * len(costs) if xs else 0.0
+
+    return RunEstimate(
+        concurrency=concurrency,
+        sources=len(costs),
+        unknown=len(costs) - len(known),
+        wall=makespan(p50s, concurrency),
+        wall_p95=makespan(p95s, concurrency),
+        serial=sum(p50s),
+        bytes=total("bytes"),
+        items=total("items"),
+        new=total("new"),
+    )
+
+
+def fmt_bytes(n: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
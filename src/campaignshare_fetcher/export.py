@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+
+from .config import load_config
+from .sinks import created_ts, kind_for
+
+CONSUMERS_DIR = "consumers"
+_CONSUMER_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def _outputs(config_path: str, state_dir: str | None = None) -> list[str]:
+    """Distinct JSONL outputs named in the config, in config order."""
+    cfg = load_config(config_path, cache_dir=state_dir)
+    seen: dict[str, None] = {}
+    for s in cfg.sources:
+        out = s.options.get("output", "data/output.jsonl")
+        if kind_for(out) == "jsonl":
+            seen.setdefault(str(out), None)
+    return list(seen)
+
+
+def _read_jsonl(path: str) -> Iterator[dict[str, Any]]:
+    p = Path(path)
+    if not p.is_file():
+        return
+    with p.open(encoding="utf-8") as f:
+        for ln in f:
+            try:
+                yield json.loads(ln)
+            except ValueError:
+                continue
+
+
+def merge_recent_to_json(
+    config_path: str, limit: int, out_path: str, state_dir: str | None = None
+) -> int:
+    """Write the ``limit`` most recent items across all outputs as one JSON list."""
+    items = [it for out in _outputs(config_path, state_dir) for it in _read_jsonl(out)]
+    items.sort(key=created_ts, reverse=True)
+    items = items[: max(0, limit)]
+    outp = Path(out_path)
+    outp.parent.mkdir(parents=True, exist_ok=True)
+    outp.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"export: {len(items)} items → {outp}")
+    return 0
+
+
+# ----------------------------
+# Incremental (per-consumer) export
+# ----------------------------
+def cursor_path(state_dir: str, consumer: str) -> Path:
+    if not _CONSUMER_RE.match(consumer):
+        raise ValueError(f"invalid consumer name: {consumer!r}")
+    return Path(state_dir) / CONSUMERS_DIR / f"{consumer}.json"
+
+
+def load_cursor(state_dir: str, consumer: str) -> dict[str, dict[str, int]]:
+    p = cursor_path(state_dir, consumer)
+    if not p.exists():
+        return {}
+    try:
+        data = json.loads(p.read_text())
+    except Exception:
+        return {}
+    return data.get("files", {}) if isinstance(data, dict) else {}
+
+
+def save_cursor(
+    state_dir: str, consumer: str, files: dict[str, dict[str, int]]
+) -> None:
+    p = cursor_path(state_dir, consumer)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".tmp")
+    with tmp.open("w") as f:
+        json.dump({"files": files}, f, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, p)
+
+
+def _copy_delta(path: str, cur: dict[str, int], sink: BinaryIO) -> tuple[dict, int]:
+    """
+    Stream complete lines appended to ``path`` since ``cur`` into ``sink``.
+    Returns the advanced cursor and the number of lines copied. Reads only the
+    delta; a file that shrank or was replaced is exported again from the start.
+    """
+    p = Path(path)
+    if not p.is_file():
+        return cur, 0
+    st = p.stat()
+    offset = int(cur.get("offset", 0))
+    if st.st_ino != cur.get("ino") or st.st_size < offset:
+        offset = 0
+    n = 0
+    with p.open("rb") as f:
+        f.seek(offset)
+        remaining = st.st_size - offset  # snapshot: ignore concurrent appends
+        while remaining > 0:
+            raw = f.readline(remaining)
+            if not raw.endswith(b"\n"):
+                break  # torn tail; picked up on the next export
+            remaining -= len(raw)
+            offset += len(raw)
+            if raw.strip():
+                sink.write(raw)
+                n += 1
+    return {"offset": offset, "ino": st.st_ino}, n
+
+
+def export_delta(
+    config_path: str,
+    consumer: str,
+    out_path: str | None = None,
+    state_dir: str = "data/state",
+) -> int:
+    """
+    Emit items appended since ``consumer``'s last export as NDJSON to
+    ``out_path`` (stdout when None or "-"). The cursor only advances after the
+    output has been flushed, so a failed export is simply repeated.
+    """
+    cursors = load_cursor(state_dir, consumer)
+    to_stdout = out_path in (None, "-")
+    if to_stdout:
+        sink: BinaryIO = sys.stdout.buffer
+    else:
+        Path(out_path).parent.mkdir(parents=True, exist_ok=True)  # type: ignore[arg-type]
+        sink = open(out_path, "wb")  # type: ignore[arg-type]  # noqa: SIM115
+
+    total = 0
+    try:
+        for out in _outputs(config_path, state_dir):
+            key = os.path.abspath(out)
+            cursors[key], n = _copy_delta(out, cursors.get(key, {}), sink)
+            total += n
+        sink.flush()
+        if not to_stdout:
+            os.fsync(sink.fileno())
+    finally:
+        if not to_stdout:
+            sink.close()
+
+    save_cursor(state_dir, consumer, cursors)
+    print(
+        f"export: {total} new items for consumer {consumer!r}"
+        + ("" if to_stdout else f" → {out_path}"),
+        file=sys.stderr if to_stdout else sys.stdout,
+    )
+    return 0
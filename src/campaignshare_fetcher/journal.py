@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any
+
+from .sinks import kind_for
+
+JOURNAL_FILE = "_journal.jsonl"
+SPOOL_DIR = "_spool"
+
+
+class RunJournal:
+    """
+    Crash journal for one ``run`` invocation.
+
+    Per source it records whether the source finished, the size of its output
+    before writing started (so a resumed run can tell which items already made
+    it to disk) and the last persisted item id. Fetched items are spooled under
+    ``<state_dir>/_spool/`` so a resumed run doesn't download them again.
+
+    The journal is an append-only log: a header line naming the config, then
+    one line per ``begin``/``done``, so recording a source costs the same no
+    matter how many sources the config has. ``open(resume=True)`` replays it;
+    the last line for a source wins and a torn trailing line is ignored.
+
+    Adapters receive the journal as ``journal=`` and use ``load_spool``,
+    ``save_spool`` and ``persisted_ids``; the CLI drives ``begin``/``done``.
+    """
+
+    resumed = False
+
+    def __init__(self, state_dir: str, config_path: str, data: dict | None = None):
+        self.state_dir = Path(state_dir)
+        self.config_path = os.path.abspath(config_path)
+        self.data: dict[str, Any] = data or {
+            "config": self.config_path,
+            "sources": {},
+        }
+        # begin/done may come from different pipeline threads
+        self._lock = threading.RLock()
+
+    @property
+    def path(self) -> Path:
+        return self.state_dir / JOURNAL_FILE
+
+    @property
+    def spool_dir(self) -> Path:
+        return self.state_dir / SPOOL_DIR
+
+    @classmethod
+    def open(cls, state_dir: str, config_path: str, resume: bool = False) -> RunJournal:
+        """
+        Resume the journal left by an interrupted run of the same config, or
+        start a fresh one (discarding any stale journal and spools).
+        """
+        j = cls(state_dir, config_path)
+        if resume and j.path.exists():
+            data = _replay(j.path)
+            if data is not None and data.get("config") == j.config_path:
+                j.data = data
+                j.resumed = True
+                j.save()  # compact, dropping any torn tail before appending
+                return j
+        j.finish()
+        j.save()
+        return j
+
+    def save(self) -> None:
+        """Rewrite the log as a header plus one line per source."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                f.write(json.dumps({"config": self.data["config"]}) + "\n")
+                for name, entry in self.data["sources"].items():
+                    f.write(json.dumps({"source": name, **entry}) + "\n")
+            os.replace(tmp, self.path)
+
+    def finish(self) -> None:
+        """Run completed: nothing left to resume."""
+        self.path.unlink(missing_ok=True)
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+    # ---- per-source bookkeeping (CLI) ----
+    def _entry(self, name: str) -> dict[str, Any]:
+        return self.data["sources"].get(name) or {}
+
+    def _record(self, name: str, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self.data["sources"][name] = entry
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"source": name, **entry}) + "\n")
+
+    def is_done(self, name: str) -> bool:
+        return self._entry(name).get("status") == "done"
+
+    def begin(self, name: str, out_path: str) -> None:
+        entry = self._entry(name)
+        if entry.get("status") == "running" and entry.get("output") == out_path:
+            return  # interrupted mid-source: keep the original offset
+        p = Path(out_path)
+        self._record(
+            name,
+            {
+                "status": "running",
+                "output": out_path,
+                "offset": p.stat().st_size if p.is_file() else 0,
+            },
+        )
+
+    def done(self, name: str) -> None:
+        entry = self._entry(name)
+        last = _last_id(Path(entry.get("output", "")), int(entry.get("offset", 0)))
+        self._record(name, {"status": "done", "last_id": last})
+        self._spool_path(name).unlink(missing_ok=True)
+
+    # ---- adapter hooks ----
+    def _spool_path(self, name: str) -> Path:
+        return self.spool_dir / f"{name}.jsonl"
+
+    def load_spool(self, name: str) -> list[dict[str, Any]] | None:
+        """Items fetched by the interrupted run, or None to fetch as usual."""
+        p = self._spool_path(name)
+        if not p.exists():
+            return None
+        try:
+            with p.open(encoding="utf-8") as f:
+                return [json.loads(ln) for ln in f if ln.strip()]
+        except Exception:
+            return None
+
+    def save_spool(self, name: str, items: list[dict[str, Any]]) -> None:
+        p = self._spool_path(name)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for it in items:
+                f.write(json.dumps(it, ensure_ascii=False) + "\n")
+        os.replace(tmp, p)
+
+    def persisted_ids(self, name: str) -> set[str]:
+        """
+        Ids already appended to the output since the source began. A torn
+        trailing line (crash mid-write) is truncated so appends stay valid.
+        """
+        entry = self._entry(name)
+        p = Path(entry.get("output", ""))
+        offset = int(entry.get("offset", 0))
+        if kind_for(str(p)) != "jsonl":
+            return set()  # sqlite/parquet batches are atomic
+        if not p.is_file() or p.stat().st_size <= offset:
+            return set()
+        ids: set[str] = set()
+        with p.open("r+b") as f:
+            f.seek(offset)
+            pos = offset
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    f.truncate(pos)
+                    break
+                pos += len(raw)
+                try:
+                    v = json.loads(raw).get("id")
+                except Exception:
+                    continue
+                if v:
+                    ids.add(str(v))
+        return ids
+
+
+def _replay(p: Path) -> dict[str, Any] | None:
+    """Journal state from the log at ``p``; None if it has no valid header."""
+    data: dict[str, Any] | None = None
+    try:
+        with p.open(encoding="utf-8") as f:
+            for ln in f:
+                try:
+                    rec = json.loads(ln)
+                except ValueError:
+                    continue  # torn line from a crash mid-append
+                if not isinstance(rec, dict):
+                    continue
+                if data is None:
+                    if not isinstance(rec.get("config"), str):
+                        return None
+                    data = {"config": rec["config"], "sources": {}}
+                elif isinstance(rec.get("source"), str):
+                    name = rec.pop("source")
+                    data["sources"][name] = rec
+    except (OSError, UnicodeDecodeError):
+        return None
+    return data
+
+
+def _last_id(p: Path, offset: int) -> str | None:
+    """Id of the last complete line written after ``offset`` (tail read only)."""
+    if kind_for(str(p)) != "jsonl" or not p.is_file():
+        return None
+    size = p.stat().st_size
+    if size <= offset:
+        return None
+    with p.open("rb") as f:
+        f.seek(max(offset, size - 65536))
+        lines = f.read().splitlines()
+    for raw in reversed(lines):
+        try:
+            v = json.loads(raw).get("id")
+        except Exception:
+            continue
+        if v:
+            return str(v)
+    return None
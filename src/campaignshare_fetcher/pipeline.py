@@ -0,0 +1,270 @@
+"""
+Staged, memory-bounded execution of a run.
+
+Sources flow through three stages connected by bounded queues::
+
+    fetch workers (xN) -> [parse queue] -> parser -> [write queue] -> writer
+
+A ``MemoryBudget`` caps the response bytes in flight: a fetch only starts once
+its expected size fits, bytes beyond that estimate are charged chunk by chunk
+as they arrive (the download pauses while the budget is exhausted), and
+everything is released after the writer has persisted the items. When writers
+fall behind, the queues fill up, fetchers block, and new fetches stop being
+admitted, so memory stays bounded.
+
+Adapters opt in by exposing ``fetch_bytes(url, timeout, max_bytes, reserve)``,
+``parse_bytes(raw, name, url, ...)`` and ``write_items(name, items, out_path, ...)``;
+other adapters run their whole ``run()`` inside a fetch worker.
+"""
+
+from __future__ import annotations
+
+import inspect
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+LOG = logging.getLogger("campaignshare.pipeline")
+
+STAGES = ("fetch_bytes", "parse_bytes", "write_items")
+_DONE = object()
+
+
+def call_accepting(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call ``fn`` with only the keyword arguments its signature declares."""
+    try:
+        params = inspect.signature(fn).parameters
+    except (TypeError, ValueError):  # pragma: no cover - builtins/C callables
+        return fn(*args, **kwargs)
+    if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params.values()):
+        return fn(*args, **kwargs)
+    return fn(*args, **{k: v for k, v in kwargs.items() if k in params})
+
+
+def staged(mod: Any) -> bool:
+    return all(callable(getattr(mod, f, None)) for f in STAGES)
+
+
+@dataclass
+class Job:
+    source: Any
+    mod: Any
+    url: str
+    out_path: str
+    # keyword arguments for run()/write_items(): since, timeout, journal, ...
+    extra: dict[str, Any] = field(default_factory=dict)
+    estimate: int = 256 * 1024
+    max_bytes: int | None = None
+    started: float = 0.0
+    charged: int = 0
+    n_bytes: int | None = None
+    raw: bytes | None = None
+    items: list[dict[str, Any]] | None = None
+    result: dict[str, Any] | None = None
+
+
+class MemoryBudget:
+    """
+    Counting limit on bytes in flight, charged per job: ``acquire`` once when
+    the job starts, ``grow`` while its body streams in, ``release`` when done.
+
+    Waiting never deadlocks: ``acquire`` goes ahead when nothing is in flight,
+    and when every job holding bytes is stalled in ``grow`` (nobody could
+    release), one of them -- the ``owner`` of the overdraft -- may go past the
+    limit until it is released. So at most one response at a time exceeds
+    the budget, and only when it alone is larger than what the others leave.
+    """
+
+    def __init__(self, limit: int | None = None):
+        self.limit = limit
+        self.in_flight = 0
+        self.peak = 0
+        self._holders = 0  # jobs with a charge
+        self._stalled = 0  # of which waiting in grow()
+        self._overdraft: object | None = None  # owner allowed past the limit
+        self._cond = threading.Condition()
+
+    def acquire(self, n: int) -> None:
+        with self._cond:
+            while (
+                self.limit is not None
+                and self.in_flight > 0
+                and self.in_flight + n > self.limit
+            ):
+                self._cond.wait()
+            self._holders += 1
+            self._add(n)
+
+    def grow(self, n: int, owner: object | None = None) -> None:
+        """Add ``n`` bytes to ``owner``'s charge, waiting for room if needed."""
+        with self._cond:
+            self._stalled += 1
+            self._cond.notify_all()  # others may be waiting for us to stall
+            try:
+                while self.limit is not None and self.in_flight + n > self.limit:
+                    if self._holders == self._stalled and (
+                        self._overdraft is None or self._overdraft is owner
+                    ):
+                        self._overdraft = owner
+                        break
+                    self._cond.wait()
+            finally:
+                self._stalled -= 1
+            self._add(n)
+
+    def adjust(self, old: int, new: int) -> None:
+        """
+        Re-charge a job once its real size is known (never blocks): returns
+        what a smaller body did not use, or books one whose adapter did not
+        report progress through ``grow``.
+        """
+        with self._cond:
+            self._add(new - old)
+            if new < old:
+                self._cond.notify_all()
+
+    def release(self, n: int, owner: object | None = None) -> None:
+        """Drop ``owner``'s whole remaining charge."""
+        with self._cond:
+            self.in_flight -= n
+            self._holders -= 1
+            if owner is not None and self._overdraft is owner:
+                self._overdraft = None
+            self._cond.notify_all()
+
+    def _add(self, n: int) -> None:
+        self.in_flight += n
+        self.peak = max(self.peak, self.in_flight)
+
+
+def run_staged(
+    sources: Iterable[Any],
+    admit: Callable[[Any], Job | None],
+    finish: Callable[[Job, dict[str, Any] | None], None],
+    run_whole: Callable[[Job], dict[str, Any] | None],
+    concurrency: int = 4,
+    memory: MemoryBudget | None = None,
+    queue_size: int | None = None,
+) -> MemoryBudget:
+    """
+    Process ``sources`` through the staged pipeline.
+
+    ``admit`` turns the next source into a Job (or None to skip/defer it); it
+    is called from fetch workers one at a time, in source order, right before
+    the fetch starts. ``finish`` is called from the single writer thread with
+    each job's result.
+    """
+    memory = memory or MemoryBudget()
+    concurrency = max(1, concurrency)
+    parse_q: queue.Queue = queue.Queue(maxsize=queue_size or concurrency)
+    write_q: queue.Queue = queue.Queue(maxsize=queue_size or concurrency)
+    todo = iter(sources)
+    dispatch = threading.Lock()
+
+    def next_job() -> Job | None:
+        with dispatch:
+            for s in todo:
+                job = admit(s)
+                if job is not None:
+                    return job
+            return None
+
+    def fail(job: Job, exc: BaseException) -> None:
+        job.raw = job.items = None
+        job.result = {"ok": False, "error": str(exc)}
+
+    def fetcher() -> None:
+        while True:
+            job = next_job()
+            if job is None:
+                return
+            memory.acquire(job.estimate)
+            job.charged = job.estimate
+            job.started = time.monotonic()
+
+            def reserve(size: int, job: Job = job) -> None:
+                if size > job.charged:
+                    memory.grow(size - job.charged, owner=job)
+                    job.charged = size
+
+            try:
+                if not staged(job.mod):
+                    job.result = run_whole(job)
+                    write_q.put(job)
+                    continue
+                journal = job.extra.get("journal")
+                if journal is not None:
+                    job.items = journal.load_spool(job.source.name)
+                if job.items is None:
+                    job.raw = call_accepting(
+                        job.mod.fetch_bytes,
+                        job.url,
+                        timeout=job.extra.get("timeout", 20.0),
+                        max_bytes=job.max_bytes,
+                        reserve=reserve,
+                    )
+                    job.n_bytes = len(job.raw)
+                    memory.adjust(job.charged, job.n_bytes)
+                    job.charged = job.n_bytes
+            except Exception as exc:
+                fail(job, exc)
+            (parse_q if job.result is None else write_q).put(job)
+
+    def parser() -> None:
+        while (job := parse_q.get()) is not _DONE:
+            try:
+                if job.items is None:
+                    job.items = call_accepting(
+                        job.mod.parse_bytes,
+                        job.raw,
+                        job.source.name,
+                        job.url,
+                        **job.extra,
+                    )
+                    job.raw = None
+                    journal = job.extra.get("journal")
+                    if journal is not None:
+                        journal.save_spool(job.source.name, job.items)
+            except Exception as exc:
+                fail(job, exc)
+            write_q.put(job)
+        write_q.put(_DONE)
+
+    def writer() -> None:
+        while (job := write_q.get()) is not _DONE:
+            try:
+                if job.result is None and staged(job.mod):
+                    kw = {k: v for k, v in job.extra.items() if k != "timeout"}
+                    job.result = call_accepting(
+                        job.mod.write_items,
+                        job.source.name,
+                        job.items,
+                        job.out_path,
+                        **kw,
+                    )
+                    if job.n_bytes is not None and job.result is not None:
+                        job.result["bytes"] = job.n_bytes
+            except Exception as exc:
+                fail(job, exc)
+            finally:
+                job.items = None
+                memory.release(job.charged, owner=job)
+            try:
+                finish(job, job.result)
+            except Exception:  # keep draining, or the fetchers would block
+                LOG.exception("finishing %s failed", job.source.name)
+
+    fetchers = [threading.Thread(target=fetcher) for _ in range(concurrency)]
+    tail = [threading.Thread(target=parser), threading.Thread(target=writer)]
+    for t in fetchers + tail:
+        t.start()
+    for t in fetchers:
+        t.join()
+    parse_q.put(_DONE)
+    for t in tail:
+        t.join()
+    LOG.info("pipeline: peak %d bytes in flight", memory.peak)
+    return memory
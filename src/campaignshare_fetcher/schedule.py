@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from .config import Source
+from .stats import mean_new
+
+
+@dataclass
+class Budget:
+    """Wall-clock budget for a single ``run`` invocation."""
+
+    seconds: float
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def reserve(self) -> float:
+        # Don't start a fetch in the last sliver of the budget.
+        return min(1.0, self.seconds * 0.05)
+
+    def remaining(self) -> float:
+        return self.seconds - (time.monotonic() - self.started)
+
+    def can_start(self, expected: float = 0.0) -> bool:
+        return self.remaining() > max(self.reserve, expected)
+
+    def deadline_for(self, timeout: float) -> float:
+        """
+        Per-source timeout, clipped to what is left of the budget.
+
+        Adapters apply it per socket operation (connect, each read), so it
+        bounds a stalled fetch but not a slow one that keeps sending bytes:
+        a source started inside the budget may finish somewhat after it.
+        """
+        return max(0.0, min(timeout, self.remaining()))
+
+
+def order_sources(
+    sources: list[Source], stats: dict[str, Any], now: float | None = None
+) -> list[Source]:
+    """
+    Order sources for a budgeted run.
+
+    Sources deferred by the previous run go first (in the order they were
+    deferred), then sources that never ran, then the rest by staleness
+    weighted by historical yield. Ties keep config order.
+    """
+    now = time.time() if now is None else now
+    deferred = {n: i for i, n in enumerate(stats.get("deferred", []))}
+    known = stats.get("sources", {})
+
+    def key(pair: tuple[int, Source]):
+        idx, s = pair
+        if s.name in deferred:
+            return (0, deferred[s.name], 0.0, idx)
+        last = known.get(s.name, {}).get("last_run")
+        if last is None:
+            return (1, 0, 0.0, idx)
+        staleness = max(0.0, now - float(last))
+        score = staleness * (1.0 + mean_new(stats, s.name))
+        return (2, 0, -score, idx)
+
+    return [s for _, s in sorted(enumerate(sources), key=key)]
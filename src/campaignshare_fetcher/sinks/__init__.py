@@ -0,0 +1,36 @@
+from . import jsonl, parquet, sqlite  # noqa: F401
+from .base import Sink, created_ts  # noqa: F401
+
+try:
+    SINKS  # type: ignore[name-defined]
+except NameError:
+    SINKS = {}
+
+SINKS.update(
+    {
+        "jsonl": jsonl.JsonlSink,
+        "sqlite": sqlite.SqliteSink,
+        "parquet": parquet.ParquetSink,
+    }
+)
+
+# output extension -> sink kind; anything else is JSONL
+EXTENSIONS = {
+    ".db": "sqlite",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+    ".parquet": "parquet",
+}
+
+
+def kind_for(output: str) -> str:
+    out = str(output).lower().rstrip("/")
+    for ext, kind in EXTENSIONS.items():
+        if out.endswith(ext):
+            return kind
+    return "jsonl"
+
+
+def open_sink(output: str, source: str = "") -> Sink:
+    """Open the sink the ``output`` option selects (by file extension)."""
+    return SINKS[kind_for(output)](str(output), source=source)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+
+class Sink:
+    """
+    Where a source's new items go. Adapters open one per write batch::
+
+        with open_sink(out_path, source=name) as sink:
+            sink.write(new_items)
+    """
+
+    kind = ""
+
+    def __init__(self, path: str, source: str = ""):
+        self.path = Path(path)
+        self.source = source
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, items: Iterable[dict[str, Any]]) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> Sink:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def created_ts(it: dict[str, Any]) -> float:
+    """Best-effort epoch seconds for an item (0.0 if unknown)."""
+    v = it.get("created_utc")
+    if isinstance(v, (int, float)):
+        return float(v)
+    s = str(it.get("created_at") or "")
+    if not s:
+        return 0.0
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            dt = parsedate_to_datetime(s)  # RSS pubDate (RFC 822)
+        except (TypeError, ValueError):
+            return 0.0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable
+
+from .base import Sink
+
+
+class JsonlSink(Sink):
+    """Append one JSON object per line (the default output format)."""
+
+    kind = "jsonl"
+
+    def write(self, items: Iterable[dict[str, Any]]) -> int:
+        n = 0
+        with self.path.open("a", encoding="utf-8") as f:
+            for it in items:
+                f.write(json.dumps(it, ensure_ascii=False) + "\n")
+                n += 1
+        return n
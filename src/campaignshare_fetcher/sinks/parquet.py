@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from typing import Any, Iterable
+
+from .base import Sink, created_ts
+
+try:  # optional dependency
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+    pq = None
+
+
+def available() -> bool:
+    return pa is not None
+
+
+class ParquetSink(Sink):
+    """
+    Parquet dataset directory: each ``write`` adds one ``part-*.parquet`` file
+    (written to a temp name, then renamed), so readers never see half a file
+    and can prune by column. Requires pyarrow.
+    """
+
+    kind = "parquet"
+
+    def __init__(self, path: str, source: str = ""):
+        if pa is None:
+            raise RuntimeError("parquet output requires pyarrow (pip install pyarrow)")
+        super().__init__(path, source)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def schema() -> Any:
+        return pa.schema(
+            [
+                ("id", pa.string()),
+                ("source", pa.string()),
+                ("title", pa.string()),
+                ("url", pa.string()),
+                ("summary", pa.string()),
+                ("created_at", pa.string()),
+                ("created_ts", pa.float64()),
+                ("tags", pa.list_(pa.string())),
+                ("data", pa.string()),
+            ]
+        )
+
+    def write(self, items: Iterable[dict[str, Any]]) -> int:
+        items = list(items)
+        if not items:
+            return 0
+        cols: dict[str, list[Any]] = {
+            "id": [str(it.get("id")) for it in items],
+            "source": [self.source] * len(items),
+            "title": [it.get("title") for it in items],
+            "url": [it.get("url") for it in items],
+            "summary": [it.get("summary") for it in items],
+            "created_at": [it.get("created_at") for it in items],
+            "created_ts": [created_ts(it) for it in items],
+            "tags": [list(it.get("tags") or []) for it in items],
+            "data": [json.dumps(it, ensure_ascii=False) for it in items],
+        }
+        table = pa.Table.from_pydict(cols, schema=self.schema())
+        name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp = self.path / f".{name}.tmp"
+        pq.write_table(table, tmp)
+        os.replace(tmp, self.path / name)
+        return len(items)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import Any, Iterable
+
+from .base import Sink, created_ts
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id         TEXT PRIMARY KEY,
+    source     TEXT NOT NULL,
+    title      TEXT,
+    url        TEXT,
+    summary    TEXT,
+    created_at TEXT,
+    created_ts REAL,
+    tags       TEXT,
+    data       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_created_ts ON items (created_ts);
+CREATE INDEX IF NOT EXISTS items_source_created_ts ON items (source, created_ts);
+"""
+
+
+class SqliteSink(Sink):
+    """
+    One row per item in table ``items`` (id primary key, indexed by created
+    time). Each ``write`` is a single transaction; re-inserting an id is a
+    no-op, so replaying a batch after a crash is harmless.
+    """
+
+    kind = "sqlite"
+
+    def __init__(self, path: str, source: str = ""):
+        super().__init__(path, source)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def _row(self, it: dict[str, Any]) -> tuple:
+        return (
+            str(it.get("id")),
+            self.source,
+            it.get("title"),
+            it.get("url"),
+            it.get("summary"),
+            it.get("created_at"),
+            created_ts(it),
+            json.dumps(it.get("tags") or [], ensure_ascii=False),
+            json.dumps(it, ensure_ascii=False),
+        )
+
+    def write(self, items: Iterable[dict[str, Any]]) -> int:
+        rows = [self._row(it) for it in items]
+        with self.conn:  # one transaction per batch
+            cur = self.conn.executemany(
+                "INSERT OR IGNORE INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return cur.rowcount if cur.rowcount >= 0 else len(rows)
+
+    def close(self) -> None:
+        self.conn.close()
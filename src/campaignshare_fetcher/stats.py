@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Any
+
+# Lives next to the per-source rss state files; the leading underscore keeps it
+# from colliding with a source that happens to be called "stats".
+STATS_FILE = "_stats.json"
+HISTORY_LEN = 20
+
+
+def stats_path(state_dir: str) -> Path:
+    return Path(state_dir) / STATS_FILE
+
+
+def load_stats(state_dir: str) -> dict[str, Any]:
+    """
+    Load per-source run statistics recorded by previous runs.
+
+    Shape: {"sources": {name: {"last_run": epoch, "history": [...], ...}},
+            "deferred": [name, ...]}
+    """
+    p = stats_path(state_dir)
+    data: dict[str, Any] = {}
+    if p.exists():
+        try:
+            data = json.loads(p.read_text())
+        except Exception:
+            data = {}
+    if not isinstance(data, dict):
+        data = {}
+    data.setdefault("sources", {})
+    data.setdefault("deferred", [])
+    return data
+
+
+def save_stats(state_dir: str, stats: dict[str, Any]) -> None:
+    p = stats_path(state_dir)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    tmp.write_text(json.dumps(stats, sort_keys=True))
+    os.replace(tmp, p)
+
+
+def record_run(
+    stats: dict[str, Any],
+    name: str,
+    res: dict[str, Any],
+    elapsed: float,
+    now: float | None = None,
+) -> None:
+    """Append one adapter result to the source's bounded history."""
+    now = time.time() if now is None else now
+    entry = stats["sources"].setdefault(name, {})
+    run: dict[str, Any] = {
+        "t": now,
+        "ok": bool(res.get("ok")),
+        "elapsed": round(float(elapsed), 3),
+    }
+    for k in ("new", "total", "bytes"):
+        v = res.get(k)
+        if isinstance(v, (int, float)):
+            run[k] = v
+    history: list[dict[str, Any]] = entry.setdefault("history", [])
+    if run["ok"] and not any(h.get("ok") for h in history):
+        # the first successful run reports the whole feed as new
+        run["initial"] = True
+    history.append(run)
+    del history[:-HISTORY_LEN]
+    entry["last_run"] = now
+    if not run["ok"]:
+        entry["last_error"] = str(res.get("error", ""))
+        entry["last_error_at"] = now
+
+
+def history(stats: dict[str, Any], name: str) -> list[dict[str, Any]]:
+    return stats.get("sources", {}).get(name, {}).get("history", [])
+
+
+def expected_seconds(stats: dict[str, Any], name: str, default: float = 0.0) -> float:
+    """Median wall time of the source's recent runs (``default`` if unknown)."""
+    xs = [h["elapsed"] for h in history(stats, name) if "elapsed" in h]
+    return statistics.median(xs) if xs else default
+
+
+def mean_new(stats: dict[str, Any], name: str) -> float:
+    xs = [h["new"] for h in history(stats, name) if h.get("ok") and "new" in h]
+    return statistics.fmean(xs) if xs else 0.0
+
+
+def expected_bytes(stats: dict[str, Any], name: str, default: int = 0) -> int:
+    """Mean response size of the source's recent runs (``default`` if unknown)."""
+    xs = [h["bytes"] for h in history(stats, name) if "bytes" in h]
+    return int(statistics.fmean(xs)) if xs else default
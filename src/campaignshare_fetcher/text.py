@@ -0,0 +1,213 @@
+"""
+Bounded-cost summaries of feed/post bodies.
+
+``summarize`` strips HTML (or just collapses whitespace for plain text)
+incrementally and stops as soon as it has ``limit`` characters, so the cost
+per item depends on the summary length, not on how large the body is -- a
+multi-MB ``content:encoded`` costs about as much as a one-line description.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from html.parser import HTMLParser
+from typing import Any, Iterable, Mapping
+from xml.etree.ElementTree import Element
+
+SUMMARY_CHARS = 280
+# Item fields ``summary_from`` may name (feed description vs. full body).
+SUMMARY_FIELDS = ("summary", "content")
+
+CHUNK = 4096
+_WS = re.compile(r"\s+")
+_SKIP = {"script", "style", "head", "template", "noscript"}
+_BLOCK = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "figcaption", "figure", "footer", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table",
+    "td", "th", "tr", "ul",
+}  # fmt: skip
+
+
+class Summarizer:
+    """
+    Accumulates whitespace-collapsed text up to ``limit`` characters.
+
+    ``feed()`` returns True once enough text was collected; callers stop
+    feeding then. ``text()`` returns the summary, ending in "…" if cut.
+    """
+
+    def __init__(self, limit: int = SUMMARY_CHARS, html: bool = True):
+        self.limit = max(0, limit)
+        self.full = self.limit == 0
+        self._parts: list[str] = []
+        self._len = 0
+        self._space = False  # a separator is pending before the next word
+        self._parser = _Stripper(self) if html else None
+
+    def feed(self, chunk: str) -> bool:
+        if self.full or not chunk:
+            return self.full
+        if self._parser is not None:
+            self._parser.feed(chunk)
+        else:
+            self.add(chunk)
+        return self.full
+
+    def close(self) -> None:
+        """Flush markup held back at the end of the input (e.g. ``a &amp``)."""
+        if self._parser is not None and not self.full:
+            self._parser.close()
+
+    def add(self, data: str) -> None:
+        """Append text data (already stripped of markup)."""
+        if self.full or not data:
+            return
+        words = _WS.split(data)
+        if words[0] == "":
+            self._space = True
+        for i, w in enumerate(words):
+            if not w:
+                continue
+            if i > 0:
+                self._space = True
+            if self._space and self._len:
+                self._push(" ")
+            self._space = False
+            self._push(w)
+            if self.full:
+                return
+        if words[-1] == "":
+            self._space = True
+
+    def separate(self) -> None:
+        self._space = True
+
+    def text(self) -> str:
+        s = "".join(self._parts)
+        if self._len > self.limit:
+            return s[: self.limit - 1].rstrip() + "…"
+        return s
+
+    def _push(self, s: str) -> None:
+        # keep one character past the limit so text() knows it was cut
+        room = self.limit + 1 - self._len
+        s = s[:room]
+        self._parts.append(s)
+        self._len += len(s)
+        if self._len > self.limit:
+            self.full = True
+
+
+class _Stripper(HTMLParser):
+    def __init__(self, out: Summarizer):
+        # charrefs are decoded by hand so data is emitted as soon as it arrives
+        # instead of being buffered up to the next tag
+        super().__init__(convert_charrefs=False)
+        self.out = out
+        self._skip = 0
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag in _SKIP:
+            self._skip += 1
+        elif tag in _BLOCK:
+            self.out.separate()
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        if tag in _BLOCK:
+            self.out.separate()
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag in _BLOCK:
+            self.out.separate()
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip:
+            self.out.add(data)
+
+    def handle_entityref(self, name: str) -> None:
+        self.handle_data(html.unescape(f"&{name};"))
+
+    def handle_charref(self, name: str) -> None:
+        self.handle_data(html.unescape(f"&#{name};"))
+
+
+def summarize(
+    text: str | Iterable[str] | None, limit: int = SUMMARY_CHARS, html: bool = True
+) -> str:
+    """
+    Plain-text summary of ``text`` (a string or an iterable of pieces, e.g.
+    ``Element.itertext()``), at most ``limit`` characters long.
+    """
+    if not text:
+        return ""
+    s = Summarizer(limit, html=html)
+    pieces = (
+        (text[i : i + CHUNK] for i in range(0, len(text), CHUNK))
+        if isinstance(text, str)
+        else text
+    )
+    for piece in pieces:
+        if s.feed(piece):
+            break
+    s.close()
+    return s.text()
+
+
+def summarize_element(el: Element, limit: int = SUMMARY_CHARS) -> str:
+    """
+    Summary of the markup inside ``el`` given as child elements, e.g. an Atom
+    ``type="xhtml"`` body. Block elements are separated like in ``summarize``.
+    """
+    s = Summarizer(limit, html=False)
+    _feed_element(el, s, root=True)
+    return s.text()
+
+
+def _feed_element(el: Element, out: Summarizer, root: bool = False) -> None:
+    tag = el.tag.rpartition("}")[2] if isinstance(el.tag, str) else ""
+    block = not root and tag in _BLOCK
+    if root or tag not in _SKIP:
+        if block:
+            out.separate()
+        out.add(el.text or "")
+        for child in el:
+            if out.full:
+                return
+            _feed_element(child, out)
+        if block:
+            out.separate()
+    if not root:
+        out.add(el.tail or "")
+
+
+def summary_options(name: str, options: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    The summary options of source ``name``, normalized for the adapters:
+    ``summary_from`` as a list of known fields (a single string is accepted),
+    ``summary_chars`` as a non-negative int. Raises ValueError if unusable.
+    """
+    out: dict[str, Any] = {}
+    if "summary_chars" in options:
+        v = options["summary_chars"]
+        if isinstance(v, str) and v.strip().isdigit():
+            v = int(v)  # e.g. summary_chars = "50"
+        if isinstance(v, bool) or not isinstance(v, int) or v < 0:
+            raise ValueError(
+                f"{name}: summary_chars must be a non-negative integer, "
+                f"got {options['summary_chars']!r}"
+            )
+        out["summary_chars"] = v
+    if "summary_from" in options:
+        v = options["summary_from"]
+        fields = [v] if isinstance(v, str) else v
+        if not isinstance(fields, list) or not all(f in SUMMARY_FIELDS for f in fields):
+            raise ValueError(
+                f"{name}: summary_from must list fields out of "
+                f"{', '.join(SUMMARY_FIELDS)}, got {v!r}"
+            )
+        out["summary_from"] = list(fields)
+    return out
@@ -0,0 +1,344 @@
+"""
+WebSub (PubSubHubbub) push ingestion for rss sources.
+
+A small HTTP receiver subscribes to the hub a feed advertises, answers the
+hub's intent verification and feeds pushed bodies through ``rss.ingest`` (the
+same parse → dedupe → JSONL path as ``rss.run``). Sources without a hub, or
+whose subscription was denied or lapsed, keep being polled.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+import time
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+from .adapters import rss
+from .config import Config, Source
+from .text import summary_options
+
+LOG = logging.getLogger("campaignshare.websub")
+
+ATOM_LINK = "{http://www.w3.org/2005/Atom}link"
+MAX_BODY = 10 * 1024 * 1024
+DEFAULT_LEASE = 86400
+
+
+def discover_hub(xml_bytes: bytes) -> tuple[str | None, str | None]:
+    """Return ``(hub, self)`` advertised via atom:link in an RSS or Atom feed."""
+    try:
+        root = ET.fromstring(xml_bytes)
+    except ET.ParseError:
+        return None, None
+    hub = topic = None
+    for ln in root.iter(ATOM_LINK):
+        rel, href = ln.attrib.get("rel", ""), ln.attrib.get("href", "")
+        if rel == "hub" and href and hub is None:
+            hub = href
+        elif rel == "self" and href and topic is None:
+            topic = href
+    return hub, topic
+
+
+@dataclass
+class Subscription:
+    source: Source
+    hub: str
+    topic: str
+    secret: str
+    token: str
+    requested_at: float = field(default_factory=time.time)
+    verified: bool = False
+    denied: bool = False
+    expires_at: float = 0.0
+
+    def active(self, now: float, margin: float = 0.0) -> bool:
+        return self.verified and not self.denied and self.expires_at - margin > now
+
+
+class PushReceiver:
+    """
+    Callback endpoint for hub subscriptions.
+
+    ``callback_base`` is the URL hubs can reach this server at; each
+    subscription gets ``<callback_base>/websub/<token>``.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        callback_base: str | None = None,
+        state_dir: str = "data/state",
+        lease_seconds: int = DEFAULT_LEASE,
+        url_index: Any | None = None,
+    ):
+        self.state_dir = state_dir
+        self.url_index = url_index
+        self.lease_seconds = lease_seconds
+        self.subs: dict[str, Subscription] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._httpd = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._thread: threading.Thread | None = None
+        h, p = self._httpd.server_address[:2]
+        self.callback_base = (callback_base or f"http://{h}:{p}").rstrip("/")
+
+    # ---- lifecycle ----
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def lock_for(self, name: str) -> threading.Lock:
+        # one writer per source: pushes and fallback polls share the state file
+        return self._locks.setdefault(name, threading.Lock())
+
+    # ---- subscriber side ----
+    def subscribe(
+        self, source: Source, hub: str, topic: str, secret: str | None = None
+    ) -> Subscription:
+        """
+        Ask ``hub`` for pushes of ``topic``. Renewals pass the current
+        ``secret``: the hub keeps signing with it until it re-verifies.
+        """
+        token = hashlib.sha1(f"{source.name}\0{topic}".encode()).hexdigest()[:16]
+        sub = Subscription(
+            source=source,
+            hub=hub,
+            topic=topic,
+            secret=secret
+            or str(source.options.get("websub_secret") or secrets.token_hex(16)),
+            token=token,
+        )
+        self.subs[token] = sub
+        form = urllib.parse.urlencode(
+            {
+                "hub.mode": "subscribe",
+                "hub.topic": topic,
+                "hub.callback": f"{self.callback_base}/websub/{token}",
+                "hub.secret": sub.secret,
+                "hub.lease_seconds": str(self.lease_seconds),
+            }
+        ).encode()
+        req = urllib.request.Request(
+            hub, data=form, headers={"User-Agent": rss.UA}, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=20) as resp:
+                if resp.status not in (202, 204):
+                    sub.denied = True
+        except Exception as e:
+            LOG.warning("subscribe %s via %s failed: %s", source.name, hub, e)
+            sub.denied = True
+        return sub
+
+    def forget(self, sub: Subscription) -> None:
+        """Stop accepting pushes for ``sub``; the hub's lease lapses on its own."""
+        if self.subs.get(sub.token) is sub:
+            del self.subs[sub.token]
+
+    # ---- callback side ----
+    def _verify_intent(self, token: str, query: dict[str, list[str]]) -> str | None:
+        """Answer a hub verification request; returns the challenge to echo."""
+        sub = self.subs.get(token)
+        q = {k: v[0] for k, v in query.items() if v}
+        if sub is None or q.get("hub.topic") != sub.topic:
+            return None
+        mode = q.get("hub.mode")
+        if mode == "denied":
+            sub.denied = True
+            LOG.warning("hub denied subscription for %s: %s", sub.source.name, q)
+            return ""
+        if mode != "subscribe" or "hub.challenge" not in q:
+            return None
+        try:
+            lease = int(q.get("hub.lease_seconds", self.lease_seconds))
+        except ValueError:
+            lease = self.lease_seconds
+        sub.verified, sub.denied = True, False
+        sub.expires_at = time.time() + lease
+        return q["hub.challenge"]
+
+    def _deliver(self, token: str, body: bytes, signature: str | None) -> bool:
+        sub = self.subs.get(token)
+        if sub is None or not _signature_ok(sub.secret, body, signature):
+            return False
+        src = sub.source  # may be swapped by a config reload meanwhile
+        try:
+            summary = summary_options(src.name, src.options)
+        except ValueError as e:
+            LOG.error("push dropped: %s", e)
+            return True
+        out = src.options.get("output", "data/output.jsonl")
+        dedupe = self.url_index if src.options.get("global_dedupe") else None
+        with self.lock_for(src.name):
+            res = rss.ingest(src.name, body, out, self.state_dir, dedupe, **summary)
+        if res.get("ok"):
+            LOG.info("push %s: %s/%s new", src.name, res["new"], res["total"])
+        else:
+            LOG.warning("push %s: %s", src.name, res.get("error"))
+        return True
+
+
+def _signature_ok(secret: str, body: bytes, header: str | None) -> bool:
+    if not header or "=" not in header:
+        return False
+    algo, _, digest = header.partition("=")
+    if algo not in ("sha1", "sha256", "sha384", "sha512"):
+        return False
+    expected = hmac.new(secret.encode(), body, algo).hexdigest()
+    return hmac.compare_digest(expected, digest.strip().lower())
+
+
+def _handler_for(rx: PushReceiver) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def _token(self) -> str | None:
+            path = urllib.parse.urlsplit(self.path).path
+            prefix = "/websub/"
+            return path[len(prefix) :] if path.startswith(prefix) else None
+
+        def _reply(self, code: int, body: bytes = b"") -> None:
+            self.send_response(code)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server API
+            token = self._token()
+            query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+            challenge = rx._verify_intent(token, query) if token else None
+            if challenge is None:
+                self._reply(404)
+            else:
+                self._reply(200, challenge.encode())
+
+        def do_POST(self) -> None:  # noqa: N802 - http.server API
+            token = self._token()
+            length = int(self.headers.get("Content-Length") or 0)
+            if not token or token not in rx.subs:
+                self._reply(404)
+                return
+            if length > MAX_BODY:
+                self._reply(413)
+                return
+            body = self.rfile.read(length)
+            # Per spec a bad signature still gets a 2xx; the body is just dropped.
+            if not rx._deliver(token, body, self.headers.get("X-Hub-Signature")):
+                LOG.warning("dropping unsigned/mis-signed push for %s", token)
+            self._reply(202)
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            LOG.debug("%s - %s", self.address_string(), fmt % args)
+
+    return Handler
+
+
+def serve(
+    sources: list[Source],
+    poll: Callable[[Source], Any],
+    receiver: PushReceiver,
+    poll_interval: float = 300.0,
+    stop: threading.Event | None = None,
+    reload: Callable[[], Config | None] | None = None,
+) -> None:
+    """
+    Subscribe rss sources that advertise a hub (unless ``websub = false``) and
+    poll everything else every ``poll_interval`` seconds until ``stop`` is set.
+
+    ``reload`` is called once per cycle and returns the new Config when it
+    changed (None otherwise, see ``ConfigLoader.reload``): added feeds get
+    subscribed, removed ones stop taking pushes, and edited ones either keep
+    their subscription with the new options or, if the feed URL changed,
+    subscribe afresh.
+    """
+    stop = stop or threading.Event()
+    receiver.start()
+    by_source: dict[str, Subscription] = {}
+    tried: dict[str, Source] = {}
+    try:
+        while not stop.is_set():
+            if reload is not None:
+                try:
+                    cfg = reload()
+                    if cfg is not None:
+                        sources = cfg.sources
+                except ValueError as e:  # bad edit: keep the last good config
+                    LOG.error("config reload failed: %s", e)
+            current = {s.name: s for s in sources}
+            for name in [n for n in tried if current.get(n) != tried[n]]:
+                old, sub = tried.pop(name), by_source.pop(name, None)
+                s = current.get(name)
+                if sub is not None and s is not None and _same_feed(old, s):
+                    sub.source = s  # e.g. a new output: later pushes go there
+                    by_source[name], tried[name] = sub, s
+                elif sub is not None:
+                    receiver.forget(sub)
+            for s in sources:
+                if s.name in tried:
+                    continue
+                tried[s.name] = s
+                if s.type.lower() == "rss" and s.options.get("websub", True):
+                    sub = _catch_up_and_subscribe(s, receiver)
+                    if sub is not None:
+                        by_source[s.name] = sub
+            now = time.time()
+            for s in sources:
+                sub = by_source.get(s.name)
+                if sub is not None and sub.active(now, margin=2 * poll_interval):
+                    continue
+                if sub is not None and sub.verified and not sub.denied:
+                    # lease about to lapse: renew, keep polling until verified
+                    by_source[s.name] = receiver.subscribe(
+                        s, sub.hub, sub.topic, secret=sub.secret
+                    )
+                elif sub is not None and not sub.denied and not sub.verified:
+                    if now - sub.requested_at < poll_interval:
+                        continue  # hub verification still in flight
+                with receiver.lock_for(s.name):
+                    poll(s)
+            stop.wait(poll_interval)
+    finally:
+        receiver.stop()
+
+
+def _same_feed(a: Source, b: Source) -> bool:
+    """True if an existing subscription for ``a`` also serves ``b``."""
+    keys = ("url", "websub")
+    return a.type == b.type and all(a.options.get(k) == b.options.get(k) for k in keys)
+
+
+def _catch_up_and_subscribe(s: Source, receiver: PushReceiver) -> Subscription | None:
+    """Fetch once (also catches up on missed items) and subscribe if possible."""
+    url = s.options.get("url")
+    if not url:
+        return None
+    try:
+        summary = summary_options(s.name, s.options)
+    except ValueError as e:
+        LOG.error("not subscribing: %s", e)
+        return None
+    try:
+        xml = rss._http_get(url)
+    except Exception as e:
+        LOG.warning("initial fetch %s failed: %s", s.name, e)
+        return None
+    out = s.options.get("output", "data/output.jsonl")
+    dedupe = receiver.url_index if s.options.get("global_dedupe") else None
+    with receiver.lock_for(s.name):
+        rss.ingest(s.name, xml, out, receiver.state_dir, dedupe, **summary)
+    hub, topic = discover_hub(xml)
+    if not hub:
+        return None
+    return receiver.subscribe(s, hub, topic or url)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+import json
+
+import pytest
+
+import campaignshare_fetcher.adapters.reddit_json as reddit
+from campaignshare_fetcher import cli
+from campaignshare_fetcher.adapters import rss
+from campaignshare_fetcher.canonical import UrlIndex, canonicalize_url
+
+
+@pytest.mark.parametrize(
+    "a,b",
+    [
+        (
+            "HTTP://Example.ORG:80/post/1/?utm_source=x&b=2&a=1#top",
+            "https://example.org/post/1?a=1&b=2",
+        ),
+        ("https://example.org/x?fbclid=abc", "https://example.org/x"),
+        ("https://redd.it/AbC123", "https://www.reddit.com/comments/abc123"),
+        (
+            "https://old.reddit.com/r/linux/comments/abc123/some_title/",
+            "https://www.reddit.com/comments/abc123",
+        ),
+        ("/r/other/comments/abc123/x/", "https://www.reddit.com/comments/abc123"),
+    ],
+)
+def test_canonicalize_url(a, b):
+    assert canonicalize_url(a) == b
+
+
+def test_canonicalize_keeps_meaningful_query():
+    assert canonicalize_url("https://e.org/?id=1") != canonicalize_url(
+        "https://e.org/?id=2"
+    )
+
+
+def test_index_persists_between_instances(tmp_path):
+    idx = UrlIndex(str(tmp_path))
+    assert idx.claim({"url": "https://e.org/a/"})
+    assert not idx.claim({"url": "http://E.org/a?utm_medium=rss"})
+    idx.commit([{"url": "https://e.org/a/"}])
+    assert not UrlIndex(str(tmp_path)).claim({"url": "https://e.org/a"})
+
+
+RSS = b"""<rss><channel>
+<item><title>Shared</title><link>https://e.org/story?utm_source=rss</link><guid>g1</guid></item>
+<item><title>Only rss</title><link>https://e.org/other</link><guid>g2</guid></item>
+</channel></rss>"""
+
+
+def test_run_dedupes_across_sources(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(rss, "_http_get", lambda url, timeout=20.0: RSS)
+    monkeypatch.setattr(
+        reddit,
+        "fetch",
+        lambda url, name, timeout=20: [
+            {"id": "reddit:p1", "url": "https://e.org/story/", "permalink": "/r/x/"},
+            {"id": "reddit:p2", "url": "https://redd.it/zz9"},
+        ],
+    )
+    cfg = tmp_path / "config.toml"
+    cfg.write_text(
+        f'[[sources]]\nname = "feed"\ntype = "rss"\nurl = "http://f"\n'
+        f'output = "{tmp_path}/feed.jsonl"\nglobal_dedupe = true\n\n'
+        f'[[sources]]\nname = "sub"\ntype = "reddit_json"\nurl = "http://r"\n'
+        f'output = "{tmp_path}/sub.jsonl"\nglobal_dedupe = true\n'
+    )
+    cli.cmd_run(str(cfg), None, state_dir=str(tmp_path / "state"))
+
+    assert "(1 cross-source dupes)" in capsys.readouterr().out
+    sub = [json.loads(ln)["id"] for ln in (tmp_path / "sub.jsonl").open()]
+    assert sub == ["reddit:p2"]
+    assert len((tmp_path / "feed.jsonl").read_text().splitlines()) == 2
+
+
+def test_failed_write_releases_its_claims(tmp_path, monkeypatch, capsys):
+    real_open_sink = rss.open_sink
+
+    def disk_full(*a, **kw):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(rss, "_http_get", lambda url, timeout=20.0: RSS)
+    monkeypatch.setattr(rss, "open_sink", disk_full)
+    monkeypatch.setattr(
+        reddit,
+        "fetch",
+        lambda url, name, timeout=20: [
+            {"id": "reddit:p2", "url": "https://redd.it/zz9"}
+        ],
+    )
+    cfg = tmp_path / "config.toml"
+    cfg.write_text(
+        f'[[sources]]\nname = "feed"\ntype = "rss"\nurl = "http://f"\n'
+        f'output = "{tmp_path}/feed.jsonl"\nglobal_dedupe = true\n\n'
+        f'[[sources]]\nname = "sub"\ntype = "reddit_json"\nurl = "http://r"\n'
+        f'output = "{tmp_path}/sub.jsonl"\nglobal_dedupe = true\n'
+    )
+    state = str(tmp_path / "state")
+    cli.cmd_run(str(cfg), None, state_dir=state)
+    assert "err feed: disk full" in capsys.readouterr().out
+
+    # "sub" committing its own claims must not have persisted feed's
+    monkeypatch.setattr(rss, "open_sink", real_open_sink)
+    cli.cmd_run(str(cfg), None, state_dir=state)
+    assert "ok  feed: 2/2 new" in capsys.readouterr().out
+    assert len((tmp_path / "feed.jsonl").read_text().splitlines()) == 2
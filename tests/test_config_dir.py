@@ -0,0 +1,119 @@
+from __future__ import annotations
+import datetime as dt
+import json
+import os
+import tomllib
+
+import pytest
+
+from campaignshare_fetcher import config as config_mod
+from campaignshare_fetcher.config import ConfigLoader, load_config
+
+TEMPLATES = """
+include = "groups/*.toml"
+
+[templates.subreddit]
+type = "reddit_json"
+name = "r-{sub}"
+url = "https://www.reddit.com/r/{sub}/new.json"
+output = "data/{sub}.jsonl"
+"""
+GROUP = """
+[[groups]]
+template = "subreddit"
+expand = { sub = ["CityBuilding", "linux"] }
+"""
+PLAIN = """
+[[sources]]
+name = "feed"
+type = "rss"
+url = "https://example.com/rss"
+"""
+
+
+def _tree(tmp_path):
+    (tmp_path / "groups").mkdir(parents=True)
+    (tmp_path / "00-templates.toml").write_text(TEMPLATES)
+    (tmp_path / "10-plain.toml").write_text(PLAIN)
+    (tmp_path / "groups" / "reddit.toml").write_text(GROUP)
+    return tmp_path
+
+
+def test_directory_with_includes_and_templates(tmp_path):
+    cfg = load_config(str(_tree(tmp_path)), cache=False)
+    assert [(s.name, s.type) for s in cfg.sources] == [
+        ("feed", "rss"),
+        ("r-CityBuilding", "reddit_json"),
+        ("r-linux", "reddit_json"),
+    ]
+    assert cfg.sources[2].options == {
+        "url": "https://www.reddit.com/r/linux/new.json",
+        "output": "data/linux.jsonl",
+    }
+
+
+def test_cache_and_incremental_reload(tmp_path, monkeypatch):
+    root = _tree(tmp_path / "conf")
+    state = tmp_path / "state"
+    state.mkdir()
+    load_config(str(root), cache_dir=state)  # warm the on-disk cache
+    # JSON in the state dir, nothing next to the config
+    (cache_file,) = state.glob("_config.*.json")
+    assert json.loads(cache_file.read_text())["sources"][0]["name"] == "feed"
+    assert sorted(p.name for p in root.iterdir()) == [
+        "00-templates.toml",
+        "10-plain.toml",
+        "groups",
+    ]
+
+    parsed: list[str] = []
+    real = tomllib.load
+
+    def counting_load(f):
+        parsed.append(os.path.basename(f.name))
+        return real(f)
+
+    monkeypatch.setattr(config_mod.tomllib, "load", counting_load)
+
+    loader = ConfigLoader(str(root), cache_dir=state)
+    assert len(loader.load().sources) == 3
+    assert parsed == []  # served from the compiled cache
+    assert loader.reload() is None
+
+    group = root / "groups" / "reddit.toml"
+    group.write_text(GROUP.replace('"linux"]', '"linux", "python"]'))
+    st = group.stat()
+    os.utime(group, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    cfg = loader.reload()
+    assert cfg is not None and cfg.sources[-1].name == "r-python"
+    assert parsed == ["reddit.toml"]
+
+
+def test_unknown_template_and_placeholder(tmp_path):
+    p = tmp_path / "c.toml"
+    p.write_text('[[groups]]\ntemplate = "nope"\n')
+    with pytest.raises(ValueError, match="unknown template"):
+        load_config(str(p), cache=False)
+    p.write_text(
+        '[templates.t]\ntype = "rss"\nurl = "{missing}"\n'
+        '[[groups]]\ntemplate = "t"\nexpand = { a = ["x"] }\n'
+    )
+    with pytest.raises(ValueError, match="bad placeholder"):
+        load_config(str(p), cache=False)
+
+
+def test_cache_keeps_toml_dates_and_skips_missing_dir(tmp_path):
+    p = tmp_path / "c.toml"
+    p.write_text(PLAIN + "since = 2025-01-02T03:04:05Z\nday = 2025-01-02\n")
+    state = tmp_path / "state"
+    load_config(str(p), cache_dir=state)
+    assert not state.exists()  # an explicit cache dir is never created
+
+    state.mkdir()
+    first = load_config(str(p), cache_dir=state)
+    cached = ConfigLoader(str(p), cache_dir=state)._config
+    assert cached is not None and cached == first
+    assert cached.sources[0].options["since"] == dt.datetime(
+        2025, 1, 2, 3, 4, 5, tzinfo=dt.timezone.utc
+    )
+    assert cached.sources[0].options["day"] == dt.date(2025, 1, 2)
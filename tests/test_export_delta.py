@@ -0,0 +1,79 @@
+from __future__ import annotations
+import json
+import os
+import subprocess
+import sys
+
+from campaignshare_fetcher.export import export_delta, merge_recent_to_json
+
+
+def _setup(tmp_path):
+    a, b = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    cfg = tmp_path / "config.toml"
+    cfg.write_text(
+        f'[[sources]]\nname = "a"\ntype = "rss"\nurl = "x"\noutput = "{a}"\n\n'
+        f'[[sources]]\nname = "b"\ntype = "rss"\nurl = "y"\noutput = "{b}"\n'
+    )
+    return str(cfg), a, b
+
+
+def _append(p, *ids):
+    with p.open("a") as f:
+        for i in ids:
+            f.write(json.dumps({"id": i, "created_at": f"2025-01-0{len(i)}"}) + "\n")
+
+
+def _ids(p):
+    return [json.loads(ln)["id"] for ln in p.read_text().splitlines()]
+
+
+def test_consumer_cursor_exports_only_new_items(tmp_path):
+    cfg, a, b = _setup(tmp_path)
+    state = str(tmp_path / "state")
+    out = tmp_path / "delta.ndjson"
+    _append(a, "a1", "a2")
+    _append(b, "b1")
+
+    export_delta(cfg, "search", str(out), state)
+    assert _ids(out) == ["a1", "a2", "b1"]
+
+    export_delta(cfg, "search", str(out), state)
+    assert out.read_text() == ""
+
+    _append(b, "b2")
+    with a.open("a") as f:
+        f.write('{"id": "torn')  # writer mid-append
+    export_delta(cfg, "search", str(out), state)
+    assert _ids(out) == ["b2"]
+
+    # other consumers keep their own cursor
+    export_delta(cfg, "archive", str(out), state)
+    assert _ids(out) == ["a1", "a2", "b1", "b2"]
+
+
+def test_consumer_export_to_stdout(tmp_path):
+    cfg, a, _ = _setup(tmp_path)
+    _append(a, "a1")
+    env = os.environ.copy()
+    env["PYTHONPATH"] = "src" + (
+        os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else ""
+    )
+    res = subprocess.run(
+        [sys.executable, "-m", "campaignshare_fetcher.cli", "export", "-c", cfg]
+        + ["--consumer", "c1", "--state-dir", str(tmp_path / "state")],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert res.returncode == 0
+    assert [json.loads(ln)["id"] for ln in res.stdout.splitlines()] == ["a1"]
+    assert "1 new items" in res.stderr
+
+
+def test_merge_recent_to_json(tmp_path):
+    cfg, a, b = _setup(tmp_path)
+    _append(a, "x", "xxx")
+    _append(b, "xx")
+    out = tmp_path / "recent.json"
+    merge_recent_to_json(cfg, 2, str(out), str(tmp_path / "state"))
+    assert [it["id"] for it in json.loads(out.read_text())] == ["xxx", "xx"]
@@ -0,0 +1,177 @@
+from __future__ import annotations
+import json
+import threading
+import time
+import types
+
+from campaignshare_fetcher import cli
+from campaignshare_fetcher.adapters import reddit_json as reddit
+from campaignshare_fetcher.pipeline import Job, MemoryBudget, run_staged
+
+
+def _listing(sub: str, n: int = 3) -> bytes:
+    children = [
+        {
+            "data": {
+                "id": f"{sub}{i}",
+                "title": f"{sub} {i}",
+                "url": f"https://example.com/{sub}/{i}",
+                "created_utc": 1700000000 + i,
+                "subreddit": sub,
+            }
+        }
+        for i in range(n)
+    ]
+    return json.dumps({"data": {"children": children}}).encode()
+
+
+def test_memory_budget_blocks_until_release():
+    mem = MemoryBudget(100)
+    mem.acquire(80)
+    got = threading.Event()
+
+    def second():
+        mem.acquire(50)
+        got.set()
+
+    t = threading.Thread(target=second)
+    t.start()
+    assert not got.wait(0.1)
+    mem.release(80)
+    assert got.wait(1)
+    t.join()
+    assert mem.peak == 80 and mem.in_flight == 50
+
+
+def test_memory_budget_admits_oversized_job_when_idle():
+    mem = MemoryBudget(10)
+    mem.acquire(1000)  # would deadlock if it had to fit
+    assert mem.in_flight == 1000
+
+
+def test_staged_pipeline_keeps_bytes_in_flight_under_budget(tmp_path):
+    size = 1000
+    mod = types.SimpleNamespace(
+        fetch_bytes=lambda url, timeout=20.0: b"x" * size,
+        parse_bytes=lambda raw, name, url: [{"id": name}],
+        write_items=lambda name, items, out: (
+            time.sleep(0.02) or {"ok": True, "new": 1, "total": 1}
+        ),
+    )
+    sources = [types.SimpleNamespace(name=f"s{i}") for i in range(12)]
+    done: list[str] = []
+
+    def admit(s):
+        return Job(source=s, mod=mod, url="u", out_path="o", estimate=size)
+
+    mem = run_staged(
+        sources,
+        admit,
+        lambda job, res: done.append(job.source.name),
+        run_whole=lambda job: None,
+        concurrency=6,
+        memory=MemoryBudget(3 * size),
+    )
+    assert sorted(done) == sorted(s.name for s in sources)
+    assert mem.peak <= 3 * size
+    assert mem.in_flight == 0
+
+
+def test_memory_budget_grow_waits_for_room():
+    mem = MemoryBudget(100)
+    a, b = object(), object()
+    mem.acquire(60)
+    mem.acquire(30)
+    grown = threading.Event()
+
+    def grow():
+        mem.grow(40, owner=b)
+        grown.set()
+
+    t = threading.Thread(target=grow)
+    t.start()
+    assert not grown.wait(0.1)  # "a" still holds 60 and is not stalled
+    mem.release(60, owner=a)
+    assert grown.wait(1)
+    t.join()
+    assert mem.in_flight == 70 and mem.peak == 90
+
+
+def test_unexpectedly_large_bodies_are_charged_as_they_stream(tmp_path):
+    size, chunk, limit = 1000, 100, 1500
+
+    def fetch_bytes(url, timeout=20.0, max_bytes=None, reserve=None):
+        for got in range(chunk, size + 1, chunk):
+            reserve(got)
+            time.sleep(0.001)
+        return b"x" * size
+
+    mod = types.SimpleNamespace(
+        fetch_bytes=fetch_bytes,
+        parse_bytes=lambda raw, name, url: [{"id": name}],
+        write_items=lambda name, items, out: {"ok": True, "new": 1, "total": 1},
+    )
+    sources = [types.SimpleNamespace(name=f"s{i}") for i in range(8)]
+    done: list[str] = []
+
+    mem = run_staged(
+        sources,
+        # history says ~100 bytes; every body is ten times that
+        lambda s: Job(source=s, mod=mod, url="u", out_path="o", estimate=chunk),
+        lambda job, res: done.append(job.source.name) if res["ok"] else None,
+        run_whole=lambda job: None,
+        concurrency=8,
+        memory=MemoryBudget(limit),
+    )
+    assert len(done) == len(sources)
+    # at most one response runs past the budget (estimate-only charging
+    # would have let all eight bodies in at once)
+    assert mem.peak <= limit + size
+    assert mem.in_flight == 0
+
+
+def test_run_concurrency_writes_every_source(tmp_path, monkeypatch, capsys):
+    subs = ["alpha", "beta", "gamma", "delta"]
+    cfg = tmp_path / "config.toml"
+    cfg.write_text(
+        "".join(
+            f'[[sources]]\nname = "{s}"\ntype = "reddit_json"\n'
+            f'url = "https://www.reddit.com/r/{s}/new.json"\n'
+            f'output = "{tmp_path / s}.jsonl"\n\n'
+            for s in subs
+        )
+    )
+    monkeypatch.setattr(
+        reddit,
+        "fetch_bytes",
+        lambda url, timeout=20, max_bytes=None: _listing(url.split("/")[-2]),
+    )
+    state = tmp_path / "state"
+
+    rc = cli.main(
+        [
+            "run",
+            "-c",
+            str(cfg),
+            "--state-dir",
+            str(state),
+            "--concurrency",
+            "3",
+            "--memory-budget",
+            "1K",
+        ]
+    )
+    assert rc == 0
+    out = capsys.readouterr().out
+    for s in subs:
+        assert f"ok  {s}: 3/3 new" in out
+        lines = (tmp_path / f"{s}.jsonl").read_text().splitlines()
+        assert len(lines) == 3
+    stats = json.loads((state / "_stats.json").read_text())
+    assert all(stats["sources"][s]["history"][-1]["bytes"] > 0 for s in subs)
+
+
+def test_parse_size():
+    assert cli._parse_size("512") == 512
+    assert cli._parse_size("64M") == 64 * 1024**2
+    assert cli._parse_size("1.5k") == 1536
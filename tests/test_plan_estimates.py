@@ -0,0 +1,164 @@
+from __future__ import annotations
+import json
+
+from campaignshare_fetcher import cli
+from campaignshare_fetcher.adapters import reddit_json as reddit
+from campaignshare_fetcher.estimate import (
+    estimate_run,
+    makespan,
+    percentile,
+    source_cost,
+)
+from campaignshare_fetcher.stats import load_stats, record_run, save_stats
+
+
+def _stats(runs: dict[str, list[dict]]) -> dict:
+    stats = {"sources": {}, "deferred": []}
+    for name, results in runs.items():
+        for i, r in enumerate(results):
+            record_run(stats, name, r, r.pop("elapsed"), now=1000.0 + i)
+    return stats
+
+
+def _ok(elapsed, new, total=10, n_bytes=2048):
+    return {
+        "ok": True,
+        "new": new,
+        "total": total,
+        "bytes": n_bytes,
+        "elapsed": elapsed,
+    }
+
+
+def test_percentile_and_makespan():
+    assert percentile([1, 2, 3, 4, 5], 50) == 3
+    assert percentile([1, 2], 95) == 1.95
+    # longest-first onto the least loaded worker
+    assert makespan([4, 3, 3, 2], 2) == 6
+    assert makespan([4, 3, 3, 2], 1) == 12
+    assert makespan([5], 8) == 5
+    assert makespan([], 4) == 0
+
+
+def test_source_cost_summarizes_history_and_flags():
+    stats = _stats(
+        {
+            # each source's first successful run backfills: all 10 new
+            "slow": [_ok(14.0, 10), _ok(12.0, 2), _ok(14.0, 3), _ok(30.0, 1)],
+            "stale": [_ok(1.0, 10), _ok(1.0, 0), _ok(1.0, 0), _ok(1.0, 0)],
+            "quiet": [_ok(1.0, 10), _ok(1.0, 4), *(_ok(1.0, 0) for _ in range(3))],
+            "caught-up": [_ok(1.0, 10), _ok(1.0, 0), _ok(1.0, 0)],
+            "broken": [
+                _ok(1.0, 1),
+                *(
+                    {"ok": False, "error": "http error: 503", "elapsed": 0.5}
+                    for _ in range(3)
+                ),
+            ],
+        }
+    )
+    slow = source_cost(stats, "slow")
+    assert slow.p50 == 14.0 and slow.p95 > 14.0
+    assert slow.items == 10 and slow.new_rate == 0.2
+    assert slow.flags == ["slow"]
+
+    assert source_cost(stats, "stale").flags == ["never-new"]
+    # judged on the recent runs, not the whole window
+    assert source_cost(stats, "quiet").flags == ["never-new"]
+    caught_up = source_cost(stats, "caught-up")
+    assert caught_up.new_rate == 0.0 and caught_up.flags == []
+
+    broken = source_cost(stats, "broken")
+    assert broken.failures == 3
+    assert broken.last_error == "http error: 503"
+    assert broken.flags == ["failing"]
+
+    assert source_cost(stats, "unknown").runs == 0
+
+
+def test_estimate_run_fills_in_sources_without_history():
+    stats = _stats({"a": [_ok(4.0, 10), _ok(4.0, 1)], "b": [_ok(2.0, 10), _ok(2.0, 3)]})
+    costs = [source_cost(stats, n) for n in ("a", "b", "new")]
+    est = estimate_run(costs, concurrency=2)
+    assert est.unknown == 1
+    assert est.serial == 4.0 + 2.0 + 3.0  # "new" assumed median latency
+    assert est.wall == 5.0
+    assert est.bytes == 3 * 2048
+    assert est.new == 6
+
+
+def test_plan_prints_costs_and_flags(tmp_path, capsys):
+    cfg = tmp_path / "config.toml"
+    cfg.write_text(
+        "".join(
+            f'[[sources]]\nname = "{n}"\ntype = "rss"\n'
+            f'url = "https://example.com/{n}.xml"\noutput = "data/{n}.jsonl"\n\n'
+            for n in ("fast", "stale", "fresh")
+        )
+    )
+    state = str(tmp_path / "state")
+    stats = _stats(
+        {
+            "fast": [_ok(2.0, 10), _ok(1.0, 5), _ok(2.0, 5), _ok(3.0, 5)],
+            "stale": [_ok(20.0, 10), *(_ok(20.0, 0) for _ in range(3))],
+        }
+    )
+    save_stats(state, stats)
+    assert load_stats(state)["sources"]["fast"]["history"]
+
+    rc = cli.main(["plan", "-c", str(cfg), "--state-dir", state, "--concurrency", "2"])
+    assert rc == 0
+    out = capsys.readouterr().out
+    assert "plan: rss:fast -> data/fast.jsonl" in out
+    assert "p50 2.0s" in out and "50% new" in out and "2.0 KiB" in out
+    assert "no history yet" in out
+    assert "3 source(s), 1 without history at concurrency 2: ~20.0s wall" in out
+    assert "flagged slow (median >= 10s): stale" in out
+    assert "flagged never new: stale" in out
+    # plan is read-only, also with an existing state dir
+    assert [p.name for p in (tmp_path / "state").iterdir()] == ["_stats.json"]
+
+
+def test_plan_without_history(tmp_path, capsys):
+    cfg = tmp_path / "config.toml"
+    cfg.write_text('[[sources]]\nname = "a"\ntype = "rss"\nurl = "u"\n')
+    state = str(tmp_path / "state")
+    assert cli.main(["plan", "-c", str(cfg), "--state-dir", state]) == 0
+    assert f"estimate: no run history in {state} yet" in capsys.readouterr().out
+
+
+def test_plan_reports_reddit_bytes_from_a_real_run(tmp_path, monkeypatch, capsys):
+    body = json.dumps(
+        {
+            "data": {
+                "children": [{"data": {"id": "p1", "title": "T", "created_utc": 1.0}}]
+            }
+        }
+    ).encode()
+
+    class Resp:
+        content = body
+
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return json.loads(self.content)
+
+    monkeypatch.setattr(reddit.requests, "get", lambda url, **kw: Resp())
+    cfg = tmp_path / "config.toml"
+    cfg.write_text(
+        '[[sources]]\nname = "sub"\ntype = "reddit_json"\n'
+        'url = "https://www.reddit.com/r/sub/new.json"\n'
+        f'output = "{tmp_path / "sub.jsonl"}"\n'
+    )
+    state = str(tmp_path / "state")
+    for _ in range(2):
+        assert cli.main(["run", "-c", str(cfg), "--state-dir", state]) == 0
+    capsys.readouterr()
+
+    assert cli.main(["plan", "-c", str(cfg), "--state-dir", state]) == 0
+    out = capsys.readouterr().out
+    assert f" · {len(body)} B · 1 items/run · 0% new · 2 runs" in out
+    assert "estimate: 1 source(s) at concurrency 1" in out
+    assert "s wall (p95 " in out and f"), {len(body)} B" in out
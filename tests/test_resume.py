@@ -0,0 +1,99 @@
+from __future__ import annotations
+import json
+
+import pytest
+
+import campaignshare_fetcher.adapters.reddit_json as reddit
+from campaignshare_fetcher import cli
+from campaignshare_fetcher.journal import RunJournal
+
+ITEMS = [
+    {"id": "a", "title": "A", "url": "u1", "created_utc": 1000},
+    {"id": "b", "title": "B", "url": "u2", "created_utc": 2000},
+    {"id": "c", "title": "C", "url": "u3", "created_utc": 3000},
+]
+
+
+def _config(tmp_path, names):
+    p = tmp_path / "config.toml"
+    p.write_text(
+        "".join(
+            f'[[sources]]\nname = "{n}"\ntype = "reddit_json"\n'
+            f'url = "https://www.reddit.com/r/{n}/new.json"\n'
+            f'output = "{tmp_path / n}.jsonl"\n\n'
+            for n in names
+        )
+    )
+    return str(p)
+
+
+def test_resume_skips_finished_sources(tmp_path, monkeypatch, capsys):
+    cfg = _config(tmp_path, ["one", "two"])
+    state = str(tmp_path / "state")
+    fetched: list[str] = []
+
+    def crashing_fetch(url, name, timeout=20):
+        fetched.append(name)
+        if name == "two":
+            raise KeyboardInterrupt  # stand-in for OOM kill / node restart
+        return ITEMS
+
+    monkeypatch.setattr(reddit, "fetch", crashing_fetch)
+    with pytest.raises(KeyboardInterrupt):
+        cli.cmd_run(cfg, None, state_dir=state)
+
+    monkeypatch.setattr(reddit, "fetch", lambda url, name, timeout=20: ITEMS)
+    fetched.clear()
+    assert cli.cmd_run(cfg, None, state_dir=state, resume=True) == 0
+    out = capsys.readouterr().out
+    assert "skip one: finished before interruption" in out
+    assert "ok  two: 3/3 new" in out
+    assert len((tmp_path / "one.jsonl").read_text().splitlines()) == 3
+    # journal is cleared after a completed run
+    assert not (tmp_path / "state" / "_journal.jsonl").exists()
+
+
+def test_resume_continues_partial_write_without_refetch(tmp_path, monkeypatch):
+    cfg = _config(tmp_path, ["one"])
+    state = str(tmp_path / "state")
+    out = tmp_path / "one.jsonl"
+
+    # interrupted run: items spooled, one line written, second line torn
+    j = RunJournal.open(state, cfg)
+    j.begin("one", str(out))
+    j.save_spool("one", ITEMS)
+    out.write_text(json.dumps(ITEMS[0]) + "\n" + '{"id": "b", "ti')
+
+    def no_network(*a, **k):
+        raise AssertionError("resumed run must not re-fetch")
+
+    monkeypatch.setattr(reddit, "fetch", no_network)
+    cli.cmd_run(cfg, None, state_dir=state, resume=True)
+
+    ids = [json.loads(ln)["id"] for ln in out.read_text().splitlines()]
+    assert ids == ["a", "b", "c"]
+    assert set((tmp_path / "one.jsonl.state").read_text().split()) == {"a", "b", "c"}
+
+
+def test_journal_appends_records_and_replays_them(tmp_path):
+    cfg = _config(tmp_path, ["one", "two"])
+    state = str(tmp_path / "state")
+    out = tmp_path / "one.jsonl"
+    out.write_text(json.dumps(ITEMS[0]) + "\n")
+
+    j = RunJournal.open(state, cfg)
+    j.begin("one", str(out))
+    j.done("one")
+    j.begin("two", str(tmp_path / "two.jsonl"))
+    before = j.path.read_bytes()
+    j.begin("three", str(tmp_path / "three.jsonl"))
+    # each record is one appended line; nothing before it is rewritten
+    assert j.path.read_bytes().startswith(before)
+    with j.path.open("a") as f:
+        f.write('{"source": "three", "sta')  # killed mid-append
+
+    j = RunJournal.open(state, cfg, resume=True)
+    assert j.resumed and j.is_done("one") and not j.is_done("two")
+    assert j._entry("three")["status"] == "running"
+    j.done("two")
+    assert RunJournal.open(state, cfg, resume=True).is_done("two")
@@ -0,0 +1,66 @@
+from __future__ import annotations
+import json
+import sqlite3
+
+import pytest
+
+from campaignshare_fetcher.adapters import rss
+from campaignshare_fetcher.sinks import kind_for, open_sink
+from campaignshare_fetcher.sinks.jsonl import JsonlSink
+from campaignshare_fetcher.sinks.sqlite import SqliteSink
+
+ITEMS = [
+    {"id": "a", "title": "A", "created_at": "2025-09-29T12:00:00+00:00"},
+    {"id": "b", "title": "B", "created_at": "Mon, 29 Sep 2025 12:05:00 +0000"},
+]
+
+RSS = b"""<rss><channel>
+<item><title>A</title><link>https://e.org/a</link><guid>ga</guid></item>
+<item><title>B</title><link>https://e.org/b</link><guid>gb</guid></item>
+</channel></rss>"""
+
+
+def test_kind_for_output_extension():
+    assert kind_for("data/x.jsonl") == "jsonl"
+    assert kind_for("data/x.db") == "sqlite"
+    assert kind_for("data/x.SQLITE") == "sqlite"
+    assert kind_for("data/x.parquet/") == "parquet"
+    assert isinstance(open_sink("/tmp/never-written.jsonl"), JsonlSink)
+
+
+def test_sqlite_sink_batches_and_ignores_repeats(tmp_path):
+    db = tmp_path / "items.db"
+    with open_sink(str(db), source="demo") as sink:
+        assert isinstance(sink, SqliteSink)
+        assert sink.write(ITEMS) == 2
+    with open_sink(str(db), source="demo") as sink:
+        assert sink.write(ITEMS[:1]) == 0
+
+    con = sqlite3.connect(db)
+    rows = con.execute(
+        "SELECT id, source, created_ts FROM items ORDER BY created_ts"
+    ).fetchall()
+    assert [(r[0], r[1]) for r in rows] == [("a", "demo"), ("b", "demo")]
+    assert rows[1][2] - rows[0][2] == 300
+    indexes = {r[1] for r in con.execute("PRAGMA index_list('items')")}
+    assert "items_created_ts" in indexes
+
+
+def test_rss_run_writes_sqlite_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(rss, "_http_get", lambda url, timeout=20.0: RSS)
+    out = tmp_path / "feed.sqlite"
+    state = str(tmp_path / "state")
+    assert rss.run("feed", "http://f", str(out), state_dir=state)["new"] == 2
+    assert rss.run("feed", "http://f", str(out), state_dir=state)["new"] == 0
+    con = sqlite3.connect(out)
+    data = [json.loads(d) for (d,) in con.execute("SELECT data FROM items")]
+    assert sorted(d["title"] for d in data) == ["A", "B"]
+
+
+def test_parquet_sink(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    out = tmp_path / "items.parquet"
+    with open_sink(str(out), source="demo") as sink:
+        sink.write(ITEMS)
+    table = pq.read_table(out, columns=["id", "created_ts"])
+    assert table.column("id").to_pylist() == ["a", "b"]
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import json
+
+import pytest
+
+from campaignshare_fetcher import cli
+from campaignshare_fetcher.adapters import rss
+from campaignshare_fetcher.text import Summarizer, summarize, summary_options
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8" ?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+  <channel>
+    <item>
+      <title>A</title>
+      <link>https://example.org/a</link>
+      <description>&lt;p&gt;Short &lt;b&gt;teaser&lt;/b&gt; &amp;amp; more&lt;/p&gt;</description>
+      <content:encoded><![CDATA[<h1>Full</h1><p>body text</p>]]></content:encoded>
+    </item>
+    <item>
+      <title>B</title>
+      <link>https://example.org/b</link>
+      <content:encoded><![CDATA[<style>p{}</style><p>Only&nbsp;content</p>]]></content:encoded>
+    </item>
+  </channel>
+</rss>
+"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>1</id><title>Text</title>
+    <summary type="text">a &lt;b&gt; is literal here</summary>
+  </entry>
+  <entry>
+    <id>2</id><title>Xhtml</title>
+    <content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>Hello</p>
+      <p>world</p></div></content>
+  </entry>
+</feed>
+"""
+
+
+def test_summarize_strips_markup_and_collapses_whitespace():
+    html = "<p>One\n\n<i>two</i></p><script>var x = '<p>';</script><li>three</li>"
+    assert summarize(html) == "One two three"
+    assert summarize("caf&eacute; &#38; bar") == "café & bar"
+
+
+def test_summarize_truncates_with_ellipsis():
+    s = summarize("<p>" + "word " * 100 + "</p>", limit=20)
+    assert len(s) <= 20 and s.endswith("…")
+    assert summarize("x" * 400, limit=50, html=False) == "x" * 49 + "…"
+    assert summarize("<p>anything</p>", limit=0) == ""
+
+
+def test_summarizer_stops_consuming_once_full():
+    s = Summarizer(limit=10)
+    chunks = ["<p>abc def ", "ghi jkl mno</p>"] + ["<p>never read</p>"] * 1000
+    fed = 0
+    for c in chunks:
+        fed += 1
+        if s.feed(c):
+            break
+    assert fed == 2
+    assert s.text() == "abc def g…"
+
+
+def test_summary_split_across_chunks():
+    s = Summarizer(limit=100)
+    for c in ["<p>hel", "lo</p", "><p>wor", "ld &am", "p; more</p>"]:
+        s.feed(c)
+    s.close()
+    assert s.text() == "hello world & more"
+
+
+def test_rss_summary_prefers_description_then_content():
+    items = list(rss.parse_feed(RSS))
+    assert items[0]["summary"] == "Short teaser & more"
+    assert items[1]["summary"] == "Only content"
+
+    items = list(rss.parse_feed(RSS, summary_from=["content"]))
+    assert items[0]["summary"] == "Full body text"
+
+    items = list(rss.parse_feed(RSS, summary_chars=0))
+    assert [it["summary"] for it in items] == ["", ""]
+
+
+def test_atom_summary_respects_content_type():
+    items = list(rss.parse_feed(ATOM))
+    assert items[0]["summary"] == "a <b> is literal here"
+    assert items[1]["summary"] == "Hello world"
+
+
+def test_summary_options_reach_the_adapter(tmp_path, monkeypatch):
+    out = tmp_path / "feed.jsonl"
+    cfg = tmp_path / "config.toml"
+    cfg.write_text(
+        '[[sources]]\nname = "feed"\ntype = "rss"\n'
+        'url = "https://example.org/feed.xml"\n'
+        f'output = "{out}"\nsummary_chars = 8\nsummary_from = ["content"]\n'
+    )
+    monkeypatch.setattr(rss, "_http_get", lambda url, timeout=20.0: RSS)
+
+    rc = cli.main(["run", "-c", str(cfg), "--state-dir", str(tmp_path / "state")])
+    assert rc == 0
+    summaries = [json.loads(ln)["summary"] for ln in out.read_text().splitlines()]
+    assert summaries == ["Full bo…", "Only co…"]
+
+
+def test_summary_options_are_normalized():
+    opts = {"summary_from": "content", "summary_chars": "50", "url": "u"}
+    assert summary_options("feed", opts) == {
+        "summary_from": ["content"],
+        "summary_chars": 50,
+    }
+    assert summary_options("feed", {}) == {}
+    for bad in (
+        {"summary_from": ["body"]},
+        {"summary_from": 3},
+        {"summary_chars": "fifty"},
+        {"summary_chars": -1},
+        {"summary_chars": True},
+    ):
+        with pytest.raises(ValueError, match="^feed: summary_"):
+            summary_options("feed", bad)
+
+
+def test_bad_summary_options_skip_the_source(tmp_path, monkeypatch, capsys):
+    cfg = tmp_path / "config.toml"
+    cfg.write_text(
+        '[[sources]]\nname = "feed"\ntype = "rss"\n'
+        'url = "https://example.org/feed.xml"\n'
+        f'output = "{tmp_path / "feed.jsonl"}"\nsummary_from = "contents"\n'
+    )
+    monkeypatch.setattr(rss, "_http_get", lambda url, timeout=20.0: RSS)
+
+    cli.main(["run", "-c", str(cfg), "--state-dir", str(tmp_path / "state")])
+    assert "skip feed: summary_from must list fields" in capsys.readouterr().out
+    assert not (tmp_path / "feed.jsonl").exists()
+
+
+def _atom(entry: str) -> bytes:
+    return (
+        '<feed xmlns="http://www.w3.org/2005/Atom"><entry><id>1</id>'
+        f"<title>T</title>{entry}</entry></feed>"
+    ).encode()
+
+
+def test_atom_type_defaults_to_text():
+    (it,) = rss.parse_feed(_atom("<summary>Use a &lt;b&gt; tag</summary>"))
+    assert it["summary"] == "Use a <b> tag"
+
+
+def test_atom_xhtml_separates_block_elements():
+    body = (
+        '<content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml">'
+        "<p>First para.</p><p>Second <b>bold</b>!</p><script>x()</script>"
+        "</div></content>"
+    )
+    (it,) = rss.parse_feed(_atom(body))
+    assert it["summary"] == "First para. Second bold!"
+
+
+def test_atom_content_mime_types():
+    def summary(content):
+        (it,) = rss.parse_feed(_atom(content), summary_from=["content"])
+        return it["summary"]
+
+    assert summary('<content type="text/html">&lt;p&gt;Hi&lt;/p&gt;</content>') == "Hi"
+    assert summary('<content type="text/plain">a &lt;p&gt;</content>') == "a <p>"
+    assert summary('<content type="image/png">iVBORw0KGgo=</content>') == ""
@@ -0,0 +1,90 @@
+from __future__ import annotations
+import time
+import types
+
+from campaignshare_fetcher import cli
+from campaignshare_fetcher.config import Source
+from campaignshare_fetcher.schedule import order_sources
+from campaignshare_fetcher.stats import load_stats, save_stats
+
+
+def _write_config(tmp_path, names):
+    p = tmp_path / "config.toml"
+    p.write_text(
+        "".join(
+            f'[[sources]]\nname = "{n}"\ntype = "fake"\nurl = "http://x/{n}"\n'
+            f'output = "{tmp_path / n}.jsonl"\n\n'
+            for n in names
+        )
+    )
+    return str(p)
+
+
+def test_order_sources_prefers_deferred_then_stale():
+    srcs = [Source(n, "rss", {}) for n in ("fresh", "stale", "never", "late")]
+    stats = {
+        "deferred": ["late"],
+        "sources": {
+            "fresh": {"last_run": 990, "history": []},
+            "stale": {"last_run": 100, "history": []},
+            "late": {"last_run": 995, "history": []},
+        },
+    }
+    got = [s.name for s in order_sources(srcs, stats, now=1000)]
+    assert got == ["late", "never", "stale", "fresh"]
+
+
+def test_budget_defers_and_next_run_picks_up(tmp_path, monkeypatch, capsys):
+    calls: list[str] = []
+
+    def fake_run(name, url, out_path, timeout=None):
+        calls.append(name)
+        assert timeout is not None and timeout <= 0.5
+        time.sleep(0.2)
+        return {"ok": True, "new": 1, "total": 1, "path": out_path}
+
+    monkeypatch.setitem(cli.ADAPTERS, "fake", types.SimpleNamespace(run=fake_run))
+    cfg = _write_config(tmp_path, ["a", "b", "c"])
+    state = str(tmp_path / "state")
+
+    assert cli.cmd_run(cfg, None, time_budget=0.3, state_dir=state) == 0
+    assert calls == ["a", "b"]
+    out = capsys.readouterr().out
+    assert "defer c:" in out
+    assert "deferred 1 source(s): c" in out
+    assert load_stats(state)["deferred"] == ["c"]
+
+    calls.clear()
+    cli.cmd_run(cfg, None, time_budget=0.3, state_dir=state)
+    assert calls[0] == "c"
+
+
+def test_adapter_exception_is_reported_not_fatal(tmp_path, monkeypatch, capsys):
+    def boom(name, url, out_path):
+        raise TimeoutError("timed out")
+
+    monkeypatch.setitem(cli.ADAPTERS, "fake", types.SimpleNamespace(run=boom))
+    cfg = _write_config(tmp_path, ["a"])
+    state = str(tmp_path / "state")
+    assert cli.cmd_run(cfg, None, state_dir=state) == 0
+    assert "err a: timed out" in capsys.readouterr().out
+    assert load_stats(state)["sources"]["a"]["last_error"] == "timed out"
+
+
+def test_source_longer_than_the_budget_runs_once_at_the_head(tmp_path, monkeypatch):
+    calls: list[str] = []
+
+    def fake_run(name, url, out_path, timeout=None):
+        calls.append(name)
+        return {"ok": True, "new": 1, "total": 1, "path": out_path}
+
+    monkeypatch.setitem(cli.ADAPTERS, "fake", types.SimpleNamespace(run=fake_run))
+    cfg = _write_config(tmp_path, ["huge", "small"])
+    state = str(tmp_path / "state")
+    # "huge" usually takes 45s, more than the whole 30s budget
+    history = [{"ok": True, "elapsed": 45.0, "new": 1, "total": 1}] * 3
+    save_stats(state, {"deferred": ["huge"], "sources": {"huge": {"history": history}}})
+
+    cli.cmd_run(cfg, None, time_budget=30, state_dir=state)
+    assert calls == ["huge", "small"]
+    assert load_stats(state)["deferred"] == []
@@ -0,0 +1,224 @@
+from __future__ import annotations
+import hmac
+import json
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from campaignshare_fetcher import websub
+from campaignshare_fetcher.adapters import rss
+from campaignshare_fetcher.config import ConfigLoader, Source
+
+FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <link rel="hub" href="http://hub.example/"/>
+  <link rel="self" href="http://feed.example/atom"/>
+  <entry><id>tag:x,1</id><title>One</title><link href="https://e.org/1"/></entry>
+  <entry><id>tag:x,2</id><title>Two</title><link href="https://e.org/2"/></entry>
+</feed>
+"""
+OTHER = FEED.replace(b"tag:x,", b"tag:y,")
+
+
+class _Hub:
+    """Stand-in hub: verifies intent, then pushes ``bodies`` to the callback."""
+
+    def __init__(self, bodies):
+        self.bodies = bodies  # list of (body, sign_ok)
+        self.done = threading.Event()
+        self.challenge_echoed = None
+        hub = self
+
+        class H(BaseHTTPRequestHandler):
+            def do_POST(self):
+                n = int(self.headers["Content-Length"])
+                form = urllib.parse.parse_qs(self.rfile.read(n).decode())
+                self.send_response(202)
+                self.end_headers()
+                threading.Thread(target=hub._notify, args=(form,)).start()
+
+            def log_message(self, *a):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), H)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:%d/" % self.httpd.server_address[1]
+
+    def _notify(self, form):
+        cb = form["hub.callback"][0]
+        q = urllib.parse.urlencode(
+            {
+                "hub.mode": "subscribe",
+                "hub.topic": form["hub.topic"][0],
+                "hub.challenge": "c-123",
+                "hub.lease_seconds": "600",
+            }
+        )
+        with urllib.request.urlopen(f"{cb}?{q}") as resp:
+            self.challenge_echoed = resp.read().decode()
+        secret = form["hub.secret"][0].encode()
+        for body, sign_ok in self.bodies:
+            sig = hmac.new(secret if sign_ok else b"wrong", body, "sha256")
+            req = urllib.request.Request(
+                cb,
+                data=body,
+                headers={"X-Hub-Signature": "sha256=" + sig.hexdigest()},
+            )
+            urllib.request.urlopen(req).close()
+        self.done.set()
+
+
+def test_discover_hub():
+    assert websub.discover_hub(FEED) == (
+        "http://hub.example/",
+        "http://feed.example/atom",
+    )
+    assert websub.discover_hub(b"<rss><channel/></rss>") == (None, None)
+
+
+def test_push_through_local_hub(tmp_path):
+    out = tmp_path / "pushed.jsonl"
+    hub = _Hub([(FEED, True), (OTHER, False), (FEED, True)])
+    rx = websub.PushReceiver(state_dir=str(tmp_path / "state"))
+    rx.start()
+    try:
+        src = Source("pushed", "rss", {"output": str(out)})
+        sub = rx.subscribe(src, hub.url, "http://feed.example/atom")
+        assert hub.done.wait(5)
+    finally:
+        rx.stop()
+        hub.httpd.shutdown()
+
+    assert hub.challenge_echoed == "c-123"
+    assert sub.verified and sub.expires_at > 0
+    titles = [json.loads(ln)["title"] for ln in out.read_text().splitlines()]
+    # mis-signed push dropped; repeated push deduped
+    assert titles == ["One", "Two"]
+
+
+def test_serve_polls_sources_without_hub(tmp_path, monkeypatch):
+    monkeypatch.setattr(rss, "_http_get", lambda url, timeout=20.0: b"<rss/>")
+    stop = threading.Event()
+    polled: list[str] = []
+
+    def poll(s):
+        polled.append(s.name)
+        stop.set()
+
+    rx = websub.PushReceiver(state_dir=str(tmp_path / "state"))
+    src = Source("nohub", "rss", {"url": "http://x", "output": str(tmp_path / "o")})
+    websub.serve([src], poll, rx, poll_interval=0.01, stop=stop)
+    assert polled == ["nohub"]
+
+
+def test_lease_renewal_keeps_the_secret(tmp_path, monkeypatch):
+    src = Source("feed", "rss", {"url": "http://x", "output": str(tmp_path / "o")})
+    sub = websub.Subscription(
+        source=src,
+        hub="http://hub.example/",
+        topic="http://feed.example/atom",
+        secret="s3cret",
+        token="t",
+        verified=True,
+        expires_at=time.time() + 1,  # inside the renewal margin
+    )
+    monkeypatch.setattr(websub, "_catch_up_and_subscribe", lambda s, rx: sub)
+    rx = websub.PushReceiver(state_dir=str(tmp_path / "state"))
+    stop = threading.Event()
+    renewals: list[str | None] = []
+
+    def subscribe(source, hub, topic, secret=None):
+        renewals.append(secret)
+        stop.set()
+        return sub
+
+    monkeypatch.setattr(rx, "subscribe", subscribe)
+    websub.serve([src], lambda s: None, rx, poll_interval=60, stop=stop)
+    assert renewals == ["s3cret"]
+
+
+def test_serve_picks_up_sources_added_to_the_config(tmp_path):
+    def write(names):
+        cfg.write_text(
+            "".join(
+                f'[[sources]]\nname = "{n}"\ntype = "rss"\nurl = "http://{n}"\n'
+                f'websub = false\noutput = "{tmp_path / n}.jsonl"\n\n'
+                for n in names
+            )
+        )
+
+    cfg = tmp_path / "config.toml"
+    write(["a"])
+    loader = ConfigLoader(str(cfg), cache=False)
+    stop = threading.Event()
+    polled: list[str] = []
+
+    def poll(s):
+        polled.append(s.name)
+        if polled == ["a"]:
+            write(["a", "b"])
+        elif s.name == "b":
+            stop.set()
+
+    rx = websub.PushReceiver(state_dir=str(tmp_path / "state"))
+    websub.serve(
+        loader.load().sources,
+        poll,
+        rx,
+        poll_interval=0.01,
+        stop=stop,
+        reload=loader.reload,
+    )
+    assert polled[:3] == ["a", "a", "b"]
+
+
+def test_serve_applies_edits_and_removals_from_the_config(tmp_path, monkeypatch):
+    def write(sources):
+        cfg.write_text(
+            "".join(
+                f'[[sources]]\nname = "{n}"\ntype = "rss"\nurl = "{url}"\n'
+                f'output = "{tmp_path / out}"\n\n'
+                for n, url, out in sources
+            )
+        )
+
+    cfg = tmp_path / "config.toml"
+    write([(n, f"http://{n}", f"{n}.jsonl") for n in "abc"])
+    loader = ConfigLoader(str(cfg), cache=False)
+    rx = websub.PushReceiver(state_dir=str(tmp_path / "state"))
+    subscribed: list[tuple[str, str]] = []
+
+    def subscribe(s, receiver):
+        subscribed.append((s.name, s.options["url"]))
+        sub = websub.Subscription(s, "http://hub", s.options["url"], "k", s.name)
+        sub.denied = True  # keeps it polled, so the test sees every cycle
+        receiver.subs[sub.token] = sub
+        return sub
+
+    monkeypatch.setattr(websub, "_catch_up_and_subscribe", subscribe)
+    stop = threading.Event()
+    polled: list[str] = []
+
+    def poll(s):
+        polled.append(s.name)
+        if polled == ["a", "b", "c"]:
+            # "a" writes elsewhere, "b" moves to a new feed, "c" is dropped
+            write([("a", "http://a", "a2.jsonl"), ("b", "http://b2", "b.jsonl")])
+        elif len(polled) == 5:
+            stop.set()
+
+    websub.serve(
+        loader.load().sources,
+        poll,
+        rx,
+        poll_interval=0.01,
+        stop=stop,
+        reload=loader.reload,
+    )
+    assert polled[3:] == ["a", "b"]
+    assert subscribed[3:] == [("b", "http://b2")]
+    assert rx.subs["a"].source.options["output"] == str(tmp_path / "a2.jsonl")
+    assert rx.subs["b"].topic == "http://b2"
+    assert "c" not in rx.subs